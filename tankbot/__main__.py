@@ -5,11 +5,19 @@ import sys
 import arrow
 import praw
 
-import tankbot.analysis.playoffs
-import tankbot.analysis.tank
-import tankbot.generate.playoffs
-import tankbot.generate.tank
-from tankbot.api import fetch_info
+from tankbot.analysis.elimination import Elimination
+from tankbot.api import fetch_info, make_client
+from tankbot.archive import Archive
+from tankbot.cache import FileCache
+from tankbot.daemon import run_daemon
+from tankbot.ledger import Ledger
+from tankbot.postcache import CachedPost, PostCache, input_hash
+from tankbot.live import LiveThread, follow
+from tankbot.metrics import NO_METRICS, Metrics
+from tankbot.posts import PLAYOFFS, TANK, Post, analyze, make_title, render_posts
+from tankbot.store import Store
+from tankbot.submit import SubmissionQueue, format_report
+from tankbot.util import Timings
 
 
 def date(s):
@@ -19,51 +27,214 @@ def date(s):
         raise ValueError("invalid date")
 
 
-def write_or_post(test, reddit, my_team, title, text):
-    if test:
-        with open("{}.md".format(my_team.code), "w") as f:
-            f.write(text)
-    else:
+def write_or_post(test, submissions, post, submission_id=None, metrics=NO_METRICS):
+    action = "write" if test else "edit" if submission_id is not None else "submit"
+    with metrics.span("write_or_post", kind=post.kind, action=action):
+        if test:
+            with open("{}.md".format(post.team.code), "w") as f:
+                f.write(post.text)
+        else:
+            submissions.put(post, submission_id)
+
+
+def make_reddit(config):
+    # oauth_url and reddit_url can point praw to a local fake endpoint
+    urls = {key: config[key] for key in ("oauth_url", "reddit_url") if key in config}
+    return praw.Reddit(
+        client_id=config["client_id"],
+        client_secret=config["client_secret"],
+        username=config["username"],
+        password=config["password"],
+        user_agent=config["user_agent"],
+        **urls
+    )
+
+
+def _outcome(s):
+    return "failed" if s.error is not None else "edited" if s.edited else "submitted"
+
+
+# Everything a run needs that can be kept between runs: the API client and its cache, the ledger, the teams, the
+# reddit session and the post cache.
+class Bot:
+    def __init__(self, args, config):
+        self.args = args
+        self.config = config
+        self.test = config.get("test", False)
+        # a JSON report and a textfile for node_exporter are written after each run when their paths are configured
+        self.metrics_report = config.get("metrics_report")
+        self.metrics_textfile = config.get("metrics_textfile")
+        metered = self.metrics_report is not None or self.metrics_textfile is not None
+        self.metrics = Metrics() if metered else NO_METRICS
+        cache = None if args.no_cache else FileCache(config.get("cache_dir", "cache"))
+        self.client = make_client(cache, self.metrics if metered else None)
+        self.ledger = None if args.no_ledger else Ledger(config.get("ledger", "ledger.jsonl"))
+        self.reddit = None if self.test else make_reddit(config)
+        self.post_cache = PostCache(config.get("post_cache", "posts"))
+        self.jobs = [(PLAYOFFS, team) for team in config["playoffs"]] + [(TANK, team) for team in config["tank"]]
+        self.teams = None
+
+    def run(self, date=None):
+        metrics = self.metrics
+        metrics.reset()
         try:
-            sub = reddit.subreddit(my_team.subreddit)
-            sub.submit(title, selftext=text, send_replies=False)
-        except Exception as e:
-            print("Error sending", e, file=sys.stderr)
+            with metrics.span("run"):
+                return self._run(date, metrics)
+        except Exception:
+            metrics.count("run_failures")
+            raise
+        finally:
+            metrics.write(self.metrics_report, self.metrics_textfile)
+
+    def _run(self, date, metrics):
+        args = self.args
+        config = self.config
+        test = self.test
+        ledger = self.ledger
+        post_cache = self.post_cache
+
+        timings = Timings()
+        info = fetch_info(
+            date, parallel=not args.serial, timings=timings, ledger=ledger, client=self.client, teams=self.teams
+        )
+        self.teams = info.teams
+        for name, elapsed in timings.entries():
+            metrics.observe("fetch", elapsed, stage=name)
+        if args.timings:
+            print(timings.report(), file=sys.stderr)
+        # keep a snapshot of every day for replays and backtests
+        if config.get("archive"):
+            with Archive(config["archive"]) as archive:
+                archive.append(info)
+        if config.get("store"):
+            with Store(config["store"]) as store:
+                store.save(info)
+
+        submissions = None
+
+        if not test:
+            submissions = SubmissionQueue(self.reddit, config.get("outbox", "outbox"), info.date)
+            submissions.resend()
+            metrics.count("outbox_dropped", len(submissions.dropped))
+            submissions.start()
+
+        jobs = self.jobs
+
+        # posts rendered and submitted from the same inputs by an earlier run are skipped, as well as the ones still
+        # waiting in the outbox
+        digest = input_hash(info, config.get("elimination", False))
+        pending = []
+        from_cache = in_outbox = 0
+        for kind, code in jobs:
+            if not args.force and post_cache.is_current(kind, code, info.date, digest, submitted=not test):
+                from_cache += 1
+            elif submissions is not None and (kind, code.lower(), make_title(info, kind)) in submissions.queued:
+                in_outbox += 1
+            else:
+                pending.append((kind, code))
+
+        elimination = self.make_elimination(info) if pending else None
+
+        unchanged = 0
+        for post in render_posts(info, pending, processes=args.jobs, elimination=elimination, metrics=metrics):
+            cached = post_cache.get(post.kind, post.team.code, info.date) if args.update else None
+            if cached is not None and cached.submission_id is not None:
+                # the post is already up, it is only edited when its text changed
+                post_cache.put(
+                    post.kind, post.team.code, info.date, CachedPost(digest, post.text, cached.submission_id)
+                )
+                if cached.markdown == post.text:
+                    unchanged += 1
+                else:
+                    write_or_post(test, submissions, post, cached.submission_id, metrics)
+            else:
+                post_cache.put(post.kind, post.team.code, info.date, CachedPost(digest, post.text))
+                write_or_post(test, submissions, post, metrics=metrics)
+
+        if submissions is not None:
+            submitted = submissions.close()
+            for s in submitted:
+                metrics.observe("submission", s.latency, kind=s.kind, outcome=_outcome(s))
+                metrics.count("submission_attempts", s.attempts, kind=s.kind)
+                if s.submission_id is not None and s.title == make_title(info, s.kind):
+                    post_cache.set_submission(s.kind, s.code, info.date, s.submission_id)
+            print(format_report(submitted), file=sys.stderr)
+        metrics.count("posts_rendered", len(pending))
+        metrics.count("posts_skipped", from_cache, reason="cache")
+        metrics.count("posts_skipped", in_outbox, reason="outbox")
+        metrics.count("posts_unchanged", unchanged)
+        print(
+            "{} post(s) rendered, {} skipped from cache, {} still in the outbox, {} unchanged".format(
+                len(pending), from_cache, in_outbox, unchanged
+            ),
+            file=sys.stderr,
+        )
+        return info
+
+    def make_elimination(self, info):
+        # mathematical clinch/elimination as the relevance filter instead of a fixed points reach
+        if not self.config.get("elimination", False):
+            return None
+        return Elimination(info, self.ledger.remaining(info.date) if self.ledger is not None else [])
+
+    def live(self, info):
+        # follows tonight's games, the threads posted for the info's day are edited as scores and moods change
+        threads = []
+        views = {}
+        # the same relevance filter as the posts being followed
+        elimination = self.make_elimination(info)
+        for kind, code in self.jobs:
+            cached = self.post_cache.get(kind, code, info.date)
+            if cached is None or (cached.submission_id is None and not self.test):
+                continue
+            a = analyze(info, kind, info.get_team_by_code(code), elimination, views)
+            threads.append(LiveThread(kind, a, cached.markdown, cached.submission_id))
+        if not threads:
+            return
+
+        submissions = None
+        if not self.test:
+            submissions = SubmissionQueue(self.reddit, self.config.get("outbox", "outbox"), info.date).start()
+
+        def publish(thread, text):
+            post = Post(thread.kind, thread.team, make_title(info, thread.kind), text)
+            write_or_post(self.test, submissions, post, thread.submission_id)
+
+        follow(info, threads, publish)
+        if submissions is not None:
+            print(format_report(submissions.close()), file=sys.stderr)
 
 
 if __name__ == "__main__":
+    if sys.argv[1:2] == ["bench"]:
+        from tankbot.bench import main
+
+        sys.exit(main(sys.argv[2:]))
+
     parser = argparse.ArgumentParser(prog="tankbot")
     parser.add_argument("--date", default=None, help="date to analyse, YYYY-MM-DD format", type=date)
+    parser.add_argument("--serial", action="store_true", help="fetch the NHL API endpoints one after another")
+    parser.add_argument("--timings", action="store_true", help="print a per-call timing breakdown to stderr")
+    parser.add_argument("--no-cache", action="store_true", help="ignore the on-disk cache of NHL API responses")
+    parser.add_argument("--no-ledger", action="store_true", help="do not keep a local ledger of the season's games")
+    parser.add_argument("--jobs", default=1, type=int, help="number of processes rendering the posts")
+    parser.add_argument("--force", action="store_true", help="render and submit every post, even unchanged ones")
+    parser.add_argument(
+        "--update", action="store_true", help="edit the posts already submitted today when they changed"
+    )
+    parser.add_argument("--daemon", action="store_true", help="stay resident and post after each night's games")
+    parser.add_argument("--live", action="store_true", help="update today's threads with live scores until games end")
     args = parser.parse_args()
 
     with open("config.json") as f:
         config = json.load(f)
-        test = config.get("test", False)
-
-        info = fetch_info(args.date)
-        # from tankbot import serde
-        # serde.dumpf("info2.json", info, indent=4)
 
-        reddit = None
-
-        if not test:
-            reddit = praw.Reddit(
-                client_id=config["client_id"],
-                client_secret=config["client_secret"],
-                username=config["username"],
-                password=config["password"],
-                user_agent=config["user_agent"],
-            )
-
-        for team in config["playoffs"]:
-            my_team = info.get_team_by_code(team)
-            a = tankbot.analysis.playoffs.Analysis(info, my_team)
-            text = tankbot.generate.playoffs.generate(a)
-            title = "Playoffs Race: {}".format(info.date.format("MMMM Do, YYYY"))
-            write_or_post(test, reddit, my_team, title, text)
-        for team in config["tank"]:
-            my_team = info.get_team_by_code(team)
-            a = tankbot.analysis.tank.Analysis(info, my_team)
-            text = tankbot.generate.tank.generate(a)
-            title = "Scouting the Tank: {}".format(info.date.format("MMMM Do, YYYY"))
-            write_or_post(test, reddit, my_team, title, text)
+    bot = Bot(args, config)
+    if args.daemon:
+        run_daemon(
+            bot.run, bot.client, morning=config.get("daemon_morning_hour", 8), live=bot.live if args.live else None
+        )
+    else:
+        info = bot.run(args.date)
+        if args.live:
+            bot.live(info)
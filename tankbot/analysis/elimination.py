@@ -0,0 +1,233 @@
+from collections import deque
+from itertools import combinations
+
+from attr import attrib, attrs
+
+SEASON_GAMES = 82
+# beyond this many choices of teams allowed to finish ahead, a team is never reported eliminated
+MAX_COMBINATIONS = 1000
+
+
+def _max_flow(graph, source, sink):
+    # Dinic's algorithm, `graph` maps node -> neighbour -> residual capacity and is modified in place
+    flow = 0
+    while True:
+        level = {source: 0}
+        queue = deque([source])
+        while queue:
+            node = queue.popleft()
+            for nxt, cap in graph[node].items():
+                if cap > 0 and nxt not in level:
+                    level[nxt] = level[node] + 1
+                    queue.append(nxt)
+        if sink not in level:
+            return flow
+
+        edges = {node: list(neighbours) for node, neighbours in graph.items()}
+
+        def push(node, limit):
+            if node == sink:
+                return limit
+            while edges[node]:
+                nxt = edges[node][-1]
+                cap = graph[node][nxt]
+                if cap > 0 and level.get(nxt) == level[node] + 1:
+                    pushed = push(nxt, min(limit, cap))
+                    if pushed:
+                        graph[node][nxt] -= pushed
+                        graph[nxt][node] = graph[nxt].get(node, 0) + pushed
+                        return pushed
+                edges[node].pop()
+            return 0
+
+        while True:
+            pushed = push(source, float("inf"))
+            if not pushed:
+                break
+            flow += pushed
+
+
+@attrs(slots=True)
+class Status:
+    team = attrib()
+    clinched = attrib(default=False)  # guaranteed a playoff spot
+    eliminated = attrib(default=False)  # cannot make the playoffs anymore
+    magic = attrib(default=None)  # points gained by the team or not gained by its rivals to clinch
+    tragic = attrib(default=None)  # points not gained by the team or gained by its rivals to be eliminated
+
+    @property
+    def alive(self):
+        return not self.clinched and not self.eliminated
+
+
+class Elimination:
+    # Clinch and elimination status of every team, from the standings and the remaining schedule.
+    #
+    # A team makes the playoffs by finishing in the top `division_spots` of its division or by taking a wild card.
+    # A wild card team has at most the division qualifiers and the other wild cards ahead of it, so finishing in the
+    # top `division_spots * divisions + wildcard_spots` of its conference is needed, but not enough: a strong division
+    # can fill that top with teams that miss the division spots. Finishing in the top `division_spots +
+    # wildcard_spots` is enough, which is what clinching uses. Whether a team can still finish in the top k of a group
+    # is the classic baseball elimination problem, solved with a max-flow over the games left between the teams that
+    # have to finish behind it, for every choice of the rivals allowed to finish ahead. NHL games hand out 2 or 3
+    # points, the flow only assumes the 2 points every game is worth, which keeps the test sound: a team reported as
+    # eliminated really is. Remaining games that are not in `games` are assumed to be against outside opponents.
+    def __init__(self, info, games=(), season_games=SEASON_GAMES, division_spots=3, wildcard_spots=2):
+        self.info = info
+        self.season_games = season_games
+        self.division_spots = division_spots
+        self.wildcard_spots = wildcard_spots
+
+        self.points = {}
+        self.max_points = {}
+        for s in info.standings:
+            self.points[s.team] = s.points
+            self.max_points[s.team] = s.points + 2 * max(season_games - s.gamesPlayed, 0)
+
+        # number of remaining games between every pair of teams
+        self.pairs = {}
+        for game in games:
+            key = frozenset((game.home, game.away))
+            self.pairs[key] = self.pairs.get(key, 0) + 1
+
+        self.divisions = {}
+        self.conferences = {}
+        for team in info.teams:
+            self.divisions.setdefault(team.division, []).append(team)
+            self.conferences.setdefault(team.conference, []).append(team)
+
+        self.statuses = {team: self._compute_status(team) for team in info.teams}
+
+    def get(self, team):
+        return self.statuses[team]
+
+    def can_meet(self, a, b):
+        # both teams can still end the season with the same number of points
+        return self.points[a] <= self.max_points[b] and self.points[b] <= self.max_points[a]
+
+    def _conference_spots(self, team):
+        divisions = {t.division for t in self.conferences[team.conference]}
+        return len(divisions) * self.division_spots + self.wildcard_spots
+
+    def _compute_status(self, team):
+        division = self.divisions[team.division]
+        conference = self.conferences[team.conference]
+        division_spots = self.division_spots
+        conference_spots = self._conference_spots(team)
+
+        eliminated = self._eliminated(team, division, division_spots) and self._eliminated(
+            team, conference, conference_spots
+        )
+        # finishing in the top (division spots + wild cards) of the conference always gets a wild card
+        clinched = self._clinched(team, division, division_spots) or self._clinched(
+            team, conference, division_spots + self.wildcard_spots
+        )
+
+        magic = min(
+            self._magic(team, division, division_spots),
+            self._magic(team, conference, division_spots + self.wildcard_spots),
+        )
+        tragics = [
+            tragic
+            for tragic in (
+                self._tragic(team, division, division_spots),
+                self._tragic(team, conference, conference_spots),
+            )
+            if tragic is not None
+        ]
+        tragic = max(tragics) if tragics else None
+        if clinched:
+            magic = 0
+        if eliminated:
+            tragic = 0
+        return Status(team, clinched=clinched, eliminated=eliminated, magic=magic, tragic=tragic)
+
+    def _clinched(self, team, group, spots):
+        # not enough rivals can reach our current points, even if we lose every game left
+        rivals = [t for t in group if t != team and self.max_points[t] >= self.points[team]]
+        return len(rivals) < spots
+
+    def _magic(self, team, group, spots):
+        maxes = sorted((self.max_points[t] for t in group if t != team), reverse=True)
+        if len(maxes) < spots:
+            return 0
+        return max(0, maxes[spots - 1] - self.points[team] + 1)
+
+    def _tragic(self, team, group, spots):
+        points = sorted((self.points[t] for t in group if t != team), reverse=True)
+        if len(points) < spots:
+            return None
+        return max(0, self.max_points[team] - points[spots - 1] + 1)
+
+    def _eliminated(self, team, group, spots):
+        target = self.max_points[team]
+        rivals = [t for t in group if t != team]
+        if len(rivals) < spots:
+            return False
+
+        # rivals already out of reach have to be among the teams finishing ahead
+        ahead = [t for t in rivals if self.points[t] > target]
+        if len(ahead) >= spots:
+            return True
+        others = [t for t in rivals if self.points[t] <= target]
+        free = spots - 1 - len(ahead)
+
+        # only rivals able to pass the team are worth letting ahead, and letting more of them ahead never hurts, so the
+        # choices are exactly the sets of `free` rivals among them
+        passers = [t for t in others if self.max_points[t] > target]
+        if len(passers) <= free:
+            return False
+
+        # the likely choices first, most teams still in the race get out here without a search
+        orders = (
+            lambda t: self.points[t],
+            lambda t: self.max_points[t],
+            lambda t: sum(count for pair, count in self.pairs.items() if t in pair),
+        )
+        tried = set()
+        for order in orders:
+            chosen = frozenset(sorted(passers, key=order, reverse=True)[:free])
+            if chosen not in tried:
+                tried.add(chosen)
+                if self._can_stay_behind(team, [t for t in others if t not in chosen], target):
+                    return False
+
+        if _count(len(passers), free) > MAX_COMBINATIONS:
+            # the search would be too long, the team is not reported eliminated unless it was proven
+            return False
+        for chosen in combinations(passers, free):
+            chosen = frozenset(chosen)
+            if chosen not in tried and self._can_stay_behind(team, [t for t in others if t not in chosen], target):
+                return False
+        return True
+
+    def _can_stay_behind(self, team, behind, target):
+        # can every team in `behind` finish with at most `target` points?
+        graph = {"s": {}, "t": {}}
+        needed = 0
+        behind_set = set(behind)
+        for t in behind:
+            graph[t] = {"t": target - self.points[t]}
+            graph["t"][t] = 0
+        for pair, count in self.pairs.items():
+            if team in pair or not pair <= behind_set:
+                continue
+            a, b = tuple(pair)
+            graph["s"][pair] = 2 * count
+            graph[pair] = {"s": 0, a: 2 * count, b: 2 * count}
+            graph[a][pair] = 0
+            graph[b][pair] = 0
+            needed += 2 * count
+        if needed == 0:
+            return True
+        return _max_flow(graph, "s", "t") == needed
+
+
+def _count(n, k):
+    result = 1
+    for i in range(k):
+        result = result * (n - i) // (i + 1)
+    return result
+
+
+__all__ = ["Elimination", "Status"]
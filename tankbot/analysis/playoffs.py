@@ -67,8 +67,8 @@ class GameAnalysis:
         self.home_in_conf = game.home in self.a.own_conference_teams
         self.away_in_conf = game.away in self.a.own_conference_teams
 
-        self.home_in_reach = self.home_diff <= self.a.reach
-        self.away_in_reach = self.away_diff <= self.a.reach
+        self.home_in_reach = self.a.is_in_reach(game.home, self.home_diff)
+        self.away_in_reach = self.a.is_in_reach(game.away, self.away_diff)
 
         self.home_in_conf_reach = self.home_in_conf and self.home_in_reach
         self.away_in_conf_reach = self.away_in_conf and self.away_in_reach
@@ -138,46 +138,41 @@ class GameAnalysis:
         return m
 
 
-class Analysis:
-    def __init__(self, info: Info, my_team: Team, reach=10):
-        self.info = info
-        self.my_team = my_team
-        self.reach = reach
-
-        self.own_division = []  # ordered list of all the team's standings in our division
-        self.other_division = []  # ordered list of all the team's standings in the other division
+class ConferenceView:
+    # standings lists and positions of a conference, shared by the analyses of all its teams
+    def __init__(self, info: Info, conference):
+        self.divisions = {}  # division name -> ordered list of the division's standings
         self.wildcard = []  # ordered list of wild card team's standings
 
-        self.own_division_teams = set()  # teams in our division
-        self.own_conference_teams = set()  # teams in our conference
+        self.division_teams = {}  # division name -> teams in the division
+        self.conference_teams = set()  # teams in the conference
         self.wildcard_teams = set()  # teams in the wild card
         self.top_teams = set()  # teams top 3 in their divisions
         self.outside_teams = set()
 
+        self._playoffs_matchups = {}  # division name -> playoffs matchups seen from that division
+        # (division name, standings version) -> rendered sections shared by the posts of the division's teams
+        self.fragments = {}
+
         place = 1
 
         # create the standings lists
 
-        for standing in self.info.standings:
-            if standing.team.conference == self.my_team.conference:
-                if standing.team.division == self.my_team.division:
-                    self.own_division.append(evolve(standing, place=place, seed=len(self.own_division) + 1))
-                    if len(self.own_division) > 3:
-                        self.wildcard.append(evolve(standing, place=place, seed=len(self.wildcard) + 1))
-                else:
-                    self.other_division.append(evolve(standing, place=place, seed=len(self.other_division) + 1))
-                    if len(self.other_division) > 3:
-                        self.wildcard.append(evolve(standing, place=place, seed=len(self.wildcard) + 1))
+        for standing in info.standings:
+            if standing.team.conference == conference:
+                division = self.divisions.setdefault(standing.team.division, [])
+                division.append(evolve(standing, place=place, seed=len(division) + 1))
+                if len(division) > 3:
+                    self.wildcard.append(evolve(standing, place=place, seed=len(self.wildcard) + 1))
                 place += 1
 
         # create positions sets
 
-        for standing in self.own_division:
-            self.own_division_teams.add(standing.team)
-            self.own_conference_teams.add(standing.team)
-
-        for standing in self.other_division:
-            self.own_conference_teams.add(standing.team)
+        for name, standings in self.divisions.items():
+            self.division_teams[name] = {standing.team for standing in standings}
+            self.conference_teams.update(self.division_teams[name])
+            for standing in standings[:3]:
+                self.top_teams.add(standing.team)
 
         for standing in self.wildcard[:2]:
             self.wildcard_teams.add(standing.team)
@@ -185,11 +180,49 @@ class Analysis:
         for standing in self.wildcard[2:]:
             self.outside_teams.add(standing.team)
 
-        for standing in self.own_division[:3]:
-            self.top_teams.add(standing.team)
+    def other_division(self, division):
+        for name, standings in self.divisions.items():
+            if name != division:
+                return standings
+        return []
+
+    def playoffs_matchups(self, division):
+        matchups = self._playoffs_matchups.get(division)
+        if matchups is None:
+            own_division = self.divisions[division]
+            other_division = self.other_division(division)
+            tops = [own_division[0], other_division[0]]
+            tops.sort(key=lambda s: s.points, reverse=True)
+            matchups = [
+                PlayoffsMatchup(high_team=tops[0], low_team=self.wildcard[1]),
+                PlayoffsMatchup(high_team=tops[1], low_team=self.wildcard[0]),
+                PlayoffsMatchup(high_team=own_division[1], low_team=own_division[2]),
+                PlayoffsMatchup(high_team=other_division[1], low_team=other_division[2]),
+            ]
+            self._playoffs_matchups[division] = matchups
+        return matchups
+
 
-        for standing in self.other_division[:3]:
-            self.top_teams.add(standing.team)
+class Analysis:
+    def __init__(self, info: Info, my_team: Team, reach=10, elimination=None, view=None):
+        self.info = info
+        self.my_team = my_team
+        self.reach = reach
+        self.elimination = elimination  # when given, replaces the reach as the relevance filter
+
+        if view is None:
+            view = ConferenceView(info, my_team.conference)
+        self.view = view
+
+        self.own_division = view.divisions[my_team.division]  # ordered list of all the team's standings in our division
+        self.other_division = view.other_division(my_team.division)  # ordered list of the other division's standings
+        self.wildcard = view.wildcard  # ordered list of wild card team's standings
+
+        self.own_division_teams = view.division_teams[my_team.division]  # teams in our division
+        self.own_conference_teams = view.conference_teams  # teams in our conference
+        self.wildcard_teams = view.wildcard_teams  # teams in the wild card
+        self.top_teams = view.top_teams  # teams top 3 in their divisions
+        self.outside_teams = view.outside_teams
 
         # calculate outlook
 
@@ -205,7 +238,13 @@ class Analysis:
         self.my_result, self.results = self._compute_matchups(self.info.results, past=True)
         self.my_game, self.games = self._compute_matchups(self.info.games)
 
-        self.playoffs_matchups = self._compute_playoffs_matchups()
+        self.playoffs_matchups = view.playoffs_matchups(my_team.division)
+
+    def is_in_reach(self, team, diff):
+        if self.elimination is None:
+            return diff <= self.reach
+        # the team is still in the race and can still end up level with us
+        return not self.elimination.get(team).eliminated and self.elimination.can_meet(self.my_team, team)
 
     def _compute_matchups(self, games, past=False):
         my_matchup = None
@@ -222,12 +261,14 @@ class Analysis:
 
         return my_matchup, matchups
 
-    def _compute_playoffs_matchups(self):
-        tops = [self.own_division[0], self.other_division[0]]
-        tops.sort(key=lambda s: s.points, reverse=True)
-        return [
-            PlayoffsMatchup(high_team=tops[0], low_team=self.wildcard[1]),
-            PlayoffsMatchup(high_team=tops[1], low_team=self.wildcard[0]),
-            PlayoffsMatchup(high_team=self.own_division[1], low_team=self.own_division[2]),
-            PlayoffsMatchup(high_team=self.other_division[1], low_team=self.other_division[2]),
-        ]
+
+def analyze_all(info: Info, teams, reach=10, elimination=None):
+    # analyses of many teams, the standings of each conference are only walked once
+    views = {}
+    analyses = []
+    for team in teams:
+        view = views.get(team.conference)
+        if view is None:
+            view = views[team.conference] = ConferenceView(info, team.conference)
+        analyses.append(Analysis(info, team, reach=reach, elimination=elimination, view=view))
+    return analyses
@@ -0,0 +1,110 @@
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional, only the simulations need it
+    np = None
+
+OVERTIME_RATE = 0.23  # share of games that go past regulation
+CHUNK_SIZE = 10000  # simulations per batch, bounds the memory used by the outcome matrices
+
+
+def _strengths(info, teams):
+    strengths = np.empty(len(teams))
+    for idx, team in enumerate(teams):
+        s = info.get_standing(team)
+        strengths[idx] = s.points / (s.gamesPlayed * 2) if s.gamesPlayed > 0 else 0.5
+    return strengths
+
+
+def _groups(teams):
+    # column indices of every division, grouped by conference
+    conferences = {}
+    for idx, team in enumerate(teams):
+        conferences.setdefault(team.conference, {}).setdefault(team.division, []).append(idx)
+    return [[np.array(cols) for cols in divisions.values()] for divisions in conferences.values()]
+
+
+_SCALE = 1 << 16
+
+
+def _threshold(prob):
+    return np.minimum(np.round(prob * _SCALE), _SCALE - 1).astype(np.uint16)
+
+
+def _simulate_chunk(args):
+    seed, size, base, home_prob, home_onehot, away_onehot, groups, division_spots, wildcard_spots = args
+    rng = np.random.default_rng(seed)
+    n_games = len(home_prob)
+
+    # play every remaining game of every simulation at once, a single 16 bit draw decides both the winner and whether
+    # the game went to overtime: the low end of the home win range and the high end of the away win range are overtimes
+    draw = rng.integers(0, _SCALE, (size, n_games), dtype=np.uint16)
+    home_win = draw < _threshold(home_prob)
+    overtime = (draw < _threshold(home_prob * OVERTIME_RATE)) | (
+        draw >= _threshold(1 - (1 - home_prob) * OVERTIME_RATE)
+    )
+    home_points = home_win * np.float32(2) + (overtime & ~home_win)
+    game_points = overtime + np.float32(2)
+    points = base + home_points @ (home_onehot - away_onehot) + game_points @ away_onehot
+
+    # random jitter below one point breaks ties
+    key = points + rng.random(points.shape, dtype=np.float32) * 0.5
+    made = np.zeros(points.shape, dtype=bool)
+    rows = np.arange(size)[:, None]
+
+    for divisions in groups:
+        # top teams of each division
+        for cols in divisions:
+            order = np.argsort(-key[:, cols], axis=1)[:, :division_spots]
+            made[rows, cols[order]] = True
+        # best remaining teams of the conference get the wild cards
+        cols = np.concatenate(divisions)
+        wildcard_key = np.where(made[:, cols], -np.inf, key[:, cols])
+        order = np.argsort(-wildcard_key, axis=1)[:, :wildcard_spots]
+        made[rows, cols[order]] = True
+
+    return made.sum(axis=0)
+
+
+def playoff_odds(info, games, simulations=100000, seed=None, processes=1, division_spots=3, wildcard_spots=2):
+    # Plays out the remaining `games` and returns the probability of each team making the playoffs.
+    #
+    # The result only depends on the seed, not on the number of processes: simulations are cut in fixed size chunks
+    # and each chunk gets its own child seed.
+    if np is None:
+        raise RuntimeError("numpy is required for playoff simulations")
+
+    teams = list(info.teams)
+    index = {team: idx for idx, team in enumerate(teams)}
+    base = np.array([info.get_standing(team).points for team in teams], dtype=np.float32)
+    strengths = _strengths(info, teams)
+
+    home = np.array([index[g.home] for g in games], dtype=np.intp)
+    away = np.array([index[g.away] for g in games], dtype=np.intp)
+    total = strengths[home] + strengths[away]
+    home_prob = np.where(total > 0, strengths[home] / np.where(total > 0, total, 1), 0.5).astype(np.float32)
+
+    home_onehot = np.zeros((len(games), len(teams)), dtype=np.float32)
+    away_onehot = np.zeros((len(games), len(teams)), dtype=np.float32)
+    home_onehot[np.arange(len(games)), home] = 1
+    away_onehot[np.arange(len(games)), away] = 1
+
+    groups = _groups(teams)
+    sizes = [min(CHUNK_SIZE, simulations - start) for start in range(0, simulations, CHUNK_SIZE)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    jobs = [
+        (s, size, base, home_prob, home_onehot, away_onehot, groups, division_spots, wildcard_spots)
+        for s, size in zip(seeds, sizes)
+    ]
+
+    if processes > 1:
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            counts = sum(pool.map(_simulate_chunk, jobs))
+    else:
+        counts = sum(map(_simulate_chunk, jobs))
+
+    return {team: float(counts[idx]) / simulations for idx, team in enumerate(teams)}
+
+
+__all__ = ["playoff_odds"]
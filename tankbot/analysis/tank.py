@@ -2,6 +2,7 @@ from attr import attrib, attrs
 
 from . import BaseMatchup, Cheer, Mood
 from ..api import Result
+from ..lottery import pick_odds, rules_for
 
 
 @attrs(slots=True)
@@ -59,16 +60,22 @@ class Analysis:
     my_game = attrib(init=False)  # my team's game tonight
     games = attrib(init=False)  # games tonight
     standings = attrib(init=False)  # relevant standings
+    draft_odds = attrib(init=False)  # draft lottery odds of the teams in the lottery
     reach = attrib(default=10)
+    elimination = attrib(default=None)  # when given, replaces the reach as the relevance filter
 
     def __attrs_post_init__(self):
         self.my_result, self.results = self._compute_matchups(self.info.results, past=True)
         self.my_game, self.games = self._compute_matchups(self.info.games)
         self.standings = [s for s in self.info.standings if self._is_team_in_range(s.team)]
+        self.draft_odds = pick_odds(self.info.standings, rules_for(self.info.date))
 
     def _is_team_in_range(self, other, past=False):
         if self.my_team == other:
             return True
+        if self.elimination is not None:
+            # the teams can still swap places
+            return self.elimination.can_meet(self.my_team, other)
         my_points = self.info.get_standing(self.my_team, past).points
         other_points = self.info.get_standing(other, past).points
         return other_points <= my_points or abs(other_points - my_points) <= self.reach
@@ -1,11 +1,19 @@
+import itertools
+import json
+from concurrent.futures import ThreadPoolExecutor
+
 from attr import attrib, attrs
 
 import arrow
 import nhlapi.io
 from nhlapi.endpoints import NHLAPI
 
-from . import localdata
-from .util import f
+from . import localdata, lottery, standings
+from .cache import make_key
+from .util import Timings, f, template
+
+MINUTE = 60
+DAY = 24 * 60 * MINUTE
 
 
 def _format_record(wins, losses, ot):
@@ -13,6 +21,11 @@ def _format_record(wins, losses, ot):
     return f("{}-{}-{}", wins, losses, ot)
 
 
+_standings_versions = itertools.count(1)
+
+_format_point_percent = template("{points / (gamesPlayed * 2):0.3f}", "points", "gamesPlayed")
+
+
 @attrs(slots=True, hash=True)
 class Team:
     id = attrib()
@@ -44,8 +57,12 @@ class Standing:
 
     def __attrs_post_init__(self):
         self.record = _format_record(self.wins, self.losses, self.ot)
-        self.projection = round((self.points / self.gamesPlayed) * 82)
-        self.point_percent = f("{self.points / (self.gamesPlayed * 2):0.3f}")
+        if self.gamesPlayed == 0:
+            self.projection = 0
+            self.point_percent = "0.000"
+        else:
+            self.projection = round((self.points / self.gamesPlayed) * 82)
+            self.point_percent = _format_point_percent(self.points, self.gamesPlayed)
 
 
 @attrs(slots=True)
@@ -60,6 +77,7 @@ class Result(Game):
     home_score = attrib()
     away_score = attrib()
     overtime = attrib()
+    shootout = attrib(default=False)
     winner = attrib(init=False)
 
     def __attrs_post_init__(self):
@@ -75,6 +93,7 @@ class Info:
     games = attrib(factory=list)
     results = attrib(factory=list)
     past_date = attrib(init=False)
+    standings_version = attrib(init=False)  # changes whenever the standings are reindexed, keys derived caches
 
     _team_id_map = attrib(init=False, factory=dict)
     _team_code_map = attrib(init=False, factory=dict)
@@ -93,6 +112,7 @@ class Info:
             self._team_code_map[team.code.lower()] = team
         self._map_standings(self._standings_team_map, self.standings)
         self._map_standings(self._past_standings_team_map, self.past_standings)
+        self.standings_version = next(_standings_versions)
 
     def _map_standings(self, smap, standings):
         for s in standings:
@@ -110,6 +130,100 @@ class Info:
         return self._standings_team_map[team]
 
 
+class _Bag(dict):
+    # dict with attribute access, mirrors the response objects returned by nhlapi
+    __slots__ = ()
+
+    def __getattr__(self, name):
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(name)
+
+
+def _bag(obj):
+    if isinstance(obj, dict):
+        return _Bag((key, _bag(val)) for key, val in obj.items())
+    elif isinstance(obj, list):
+        return [_bag(item) for item in obj]
+    return obj
+
+
+def _plain(obj):
+    if isinstance(obj, dict):
+        return {key: _plain(val) for key, val in obj.items()}
+    elif isinstance(obj, (list, tuple)):
+        return [_plain(item) for item in obj]
+    elif hasattr(obj, "__dict__"):
+        return {key: _plain(val) for key, val in vars(obj).items()}
+    return obj
+
+
+def _schedule_ttl(params, data):
+    today = arrow.now().date().isoformat()
+    end = params.get("end_date") or today
+    games = [game for d in data.get("dates", []) for game in d.get("games", [])]
+    if end < today and all(game.get("status", {}).get("abstractGameState") == "Final" for game in games):
+        # final results never change
+        return None
+    return 5 * MINUTE
+
+
+class CachedNHLAPI:
+    # time to live of the responses of each endpoint, in seconds, None means forever
+    ttls = {
+        "teams": lambda params, data: 3 * DAY,
+        "standings": lambda params, data: 15 * MINUTE,
+        "schedule": _schedule_ttl,
+    }
+
+    def __init__(self, api, cache):
+        self.api = api
+        self.cache = cache
+
+    def __getattr__(self, name):
+        func = getattr(self.api, name)
+        ttl = self.ttls.get(name)
+        if ttl is None:
+            return func
+
+        def call(**params):
+            key = make_key(name, params)
+            value = self.cache.get(key)
+            if value is not None:
+                return _bag(value)
+            data = func(**params)
+            value = _plain(data)
+            self.cache.set(key, value, ttl(params, value))
+            return data
+
+        return call
+
+
+# Records a span, a call and the bytes received for each endpoint call that reaches the network.
+#
+# nhlapi does not expose the raw responses, the bytes are those of the decoded response encoded back to JSON, which is
+# what the API sends minus whitespace.
+class MeteredNHLAPI:
+    def __init__(self, api, metrics):
+        self.api = api
+        self.metrics = metrics
+
+    def __getattr__(self, name):
+        func = getattr(self.api, name)
+        if name.startswith("_") or not callable(func):
+            return func
+
+        def call(**params):
+            with self.metrics.span("api_call", endpoint=name):
+                data = func(**params)
+            self.metrics.count("api_calls", endpoint=name)
+            self.metrics.count("api_bytes", len(json.dumps(_plain(data), separators=(",", ":"))), endpoint=name)
+            return data
+
+        return call
+
+
 def _get_teams(client):
     teams = []
     data = client.teams()
@@ -162,11 +276,43 @@ def _get_standings(info, client, date, past=False):
         standings.append(standing)
         place += 1
 
+
+def assign_lottery_odds(standings, rules=lottery.DEFAULT_RULES):
+    # first overall odds, in percent
+    odds = lottery.pick_odds(standings, rules)
     for s in standings:
-        try:
-            s.odds = localdata.lottery[len(info.teams) - s.place]
-        except IndexError:
-            s.odds = 0
+        pick = odds.get(s.team)
+        s.odds = round(pick.slots[0] * 100, 1) if pick is not None else 0
+
+
+# detailed states of the games that will not be played on their date, the schedule keeps those in Preview
+CALLED_OFF_STATES = ("Postponed", "Cancelled")
+
+
+def is_called_off(entry):
+    return entry.status.get("detailedState") in CALLED_OFF_STATES
+
+
+def parse_game(info, entry):
+    date = arrow.get(entry.gameDate).to("local")
+    home = info.get_team_by_id(entry.teams.home.team.id)
+    away = info.get_team_by_id(entry.teams.away.team.id)
+    return Game(time=date, home=home, away=away)
+
+
+def parse_result(info, entry):
+    date = arrow.get(entry.gameDate).to("local")
+    home = info.get_team_by_id(entry.teams.home.team.id)
+    away = info.get_team_by_id(entry.teams.away.team.id)
+    return Result(
+        time=date,
+        home=home,
+        away=away,
+        home_score=entry.teams.home.score,
+        away_score=entry.teams.away.score,
+        overtime=len(entry.linescore.periods) > 3,
+        shootout=getattr(entry.linescore, "hasShootout", False),
+    )
 
 
 def _get_games(info, client):
@@ -174,42 +320,95 @@ def _get_games(info, client):
     data = client.schedule(start_date=today, end_date=today)
     if len(data.dates) > 0:
         for entry in data.dates[0].games:
-            date = arrow.get(entry.gameDate).to("local")
-            home = info.get_team_by_id(entry.teams.home.team.id)
-            away = info.get_team_by_id(entry.teams.away.team.id)
-            game = Game(time=date, home=home, away=away)
-            info.games.append(game)
+            info.games.append(parse_game(info, entry))
 
 
 def _get_results(info, client):
     yesterday = info.past_date.date().isoformat()
-    data = client.schedule(
-        start_date=yesterday, end_date=yesterday, expand="schedule.linescore"
-    )
+    data = client.schedule(start_date=yesterday, end_date=yesterday, expand="schedule.linescore")
     if len(data.dates) > 0:
         for entry in data.dates[0].games:
-            date = arrow.get(entry.gameDate).to("local")
-            home = info.get_team_by_id(entry.teams.home.team.id)
-            away = info.get_team_by_id(entry.teams.away.team.id)
-            result = Result(
-                time=date,
-                home=home,
-                away=away,
-                home_score=entry.teams.home.score,
-                away_score=entry.teams.away.score,
-                overtime=len(entry.linescore.periods) > 3,
-            )
-            info.results.append(result)
+            info.results.append(parse_result(info, entry))
 
 
-def fetch_info(date=None):
-    client = NHLAPI(nhlapi.io.Client())
+def _timed(timings, name, func, *args):
+    with timings.measure(name):
+        func(*args)
+
+
+def _compute_standings(info, results, past_results):
+    info.standings.extend(standings.compute_standings(info.teams, results))
+    info.past_standings.extend(standings.compute_standings(info.teams, past_results))
 
-    info = Info(_get_teams(client), date)
-    _get_standings(info, client, info.date)
-    _get_standings(info, client, info.past_date, True)
-    _get_games(info, client)
-    _get_results(info, client)
-    info._rebuild_cache()
+
+def make_client(cache=None, metrics=None):
+    client = NHLAPI(nhlapi.io.Client())
+    if metrics is not None:
+        # under the cache, responses served from it are not counted as calls
+        client = MeteredNHLAPI(client, metrics)
+    if cache is not None:
+        client = CachedNHLAPI(client, cache)
+    return client
+
+
+def all_final(client, date):
+    # every game scheduled on the date is over
+    day = date.format("YYYY-MM-DD")
+    data = client.schedule(start_date=day, end_date=day)
+    return all(entry.status.abstractGameState == "Final" for d in data.dates for entry in d.games)
+
+
+def fetch_info(date=None, parallel=True, timings=None, cache=None, results=None, ledger=None, client=None, teams=None):
+    # a long running process passes its client and the teams of a previous info to keep them between runs
+    if client is None:
+        client = make_client(cache)
+    if timings is None:
+        timings = Timings()
+
+    with timings.measure("total"):
+        with timings.measure("teams"):
+            info = Info(teams if teams is not None else _get_teams(client), date)
+
+        # these calls only depend on the team index, each one fills its own list of the info
+        calls = []
+        if ledger is None:
+            calls.append(("games", _get_games, info, client))
+            calls.append(("results", _get_results, info, client))
+        else:
+            # a single ranged request brings the ledger up to date, everything else is read from it
+            with timings.measure("ledger_sync"):
+                ledger.sync(client, info, info.date)
+            info.games.extend(ledger.games_on(info.date))
+            info.results.extend(ledger.results_on(info.past_date))
+            calls.append(
+                (
+                    "local_standings",
+                    _compute_standings,
+                    info,
+                    ledger.results_before(info.date),
+                    ledger.results_before(info.past_date),
+                )
+            )
+        if ledger is None and results is None:
+            calls.append(("standings", _get_standings, info, client, info.date))
+            calls.append(("past_standings", _get_standings, info, client, info.past_date, True))
+        elif ledger is None:
+            # rebuild both standings from the season's results, no need to hit the network
+            results_before = [r for r in results if r.time.date() < info.date.date()]
+            past_results_before = [r for r in results if r.time.date() < info.past_date.date()]
+            calls.append(("local_standings", _compute_standings, info, results_before, past_results_before))
+        if parallel:
+            with ThreadPoolExecutor(max_workers=len(calls)) as pool:
+                futures = [pool.submit(_timed, timings, *call) for call in calls]
+                for future in futures:
+                    future.result()
+        else:
+            for call in calls:
+                _timed(timings, *call)
+
+        rules = lottery.rules_for(info.date)
+        assign_lottery_odds(info.standings, rules)
+        assign_lottery_odds(info.past_standings, rules)
+        info._rebuild_cache()
 
     return info
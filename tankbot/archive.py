@@ -0,0 +1,126 @@
+import fcntl
+import mmap
+import os
+import struct
+from datetime import date as Date
+from pathlib import Path
+
+from . import serde
+from .util import as_date
+
+_MAGIC = b"TKBA"
+_VERSION = 1
+_HEADER = struct.Struct("<4sB")
+_FRAME = struct.Struct("<10sI")  # ISO date, length of the snapshot
+
+
+# Daily Info snapshots of a season in a single file.
+#
+# layout: magic, version, then one frame per day: ISO date, snapshot length, binary snapshot (serde.dumpb)
+#
+# Frames are only ever appended, a day written twice is read from its last frame. The offset index is built lazily by
+# walking the frame headers of a read-only memory map, so loading one day never touches the snapshots of other days.
+# Appends hold an exclusive lock on the file, a manual run overlapping the daily one cannot cut off the other's frame.
+class Archive:
+    def __init__(self, path):
+        self.path = Path(path)
+        self._index = None  # date -> (offset, length) of the snapshot
+        self._end = 0  # end of the last complete frame
+        self._file = None
+        self._map = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self._index = None
+
+    def _open(self):
+        if self._map is not None or not self.path.exists() or self.path.stat().st_size == 0:
+            return self._map
+        self._file = self.path.open("rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._map
+
+    def _build_index(self):
+        index = {}
+        end = 0
+        data = self._open()
+        if data is not None:
+            magic, version = _HEADER.unpack_from(data, 0)
+            if magic != _MAGIC:
+                raise ValueError("{} is not a snapshot archive".format(self.path))
+            if version != _VERSION:
+                raise ValueError("unsupported archive version {}".format(version))
+            pos = end = _HEADER.size
+            size = len(data)
+            while pos + _FRAME.size <= size:
+                day, length = _FRAME.unpack_from(data, pos)
+                start = pos + _FRAME.size
+                if start + length > size:
+                    break  # frame cut short by an interrupted append
+                index[Date(int(day[0:4]), int(day[5:7]), int(day[8:10]))] = (start, length)
+                pos = end = start + length
+        self._index = index
+        self._end = end
+        return index
+
+    @property
+    def index(self):
+        if self._index is None:
+            self._build_index()
+        return self._index
+
+    def __len__(self):
+        return len(self.index)
+
+    def __contains__(self, date):
+        return as_date(date) in self.index
+
+    def dates(self):
+        return sorted(self.index)
+
+    def load(self, date):
+        offset, length = self.index[as_date(date)]
+        return serde.loadb(self._map[offset : offset + length])
+
+    def days(self, start=None, end=None):
+        # (date, info) for each day in [start, end], one snapshot in memory at a time
+        start = as_date(start) if start is not None else None
+        end = as_date(end) if end is not None else None
+        for date in self.dates():
+            if (start is None or date >= start) and (end is None or date <= end):
+                yield date, self.load(date)
+
+    def append(self, info, date=None):
+        date = as_date(date if date is not None else info.date)
+        data = serde.dumpb(info)
+        with self.path.open("ab") as f:
+            # released when the file is closed, the index is only read under the lock so that it sees the frames of
+            # whoever held it before
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            self.close()
+            self._build_index()  # finds the end of the last complete frame
+            end = self._end
+            self.close()
+            if end == 0:
+                f.truncate(0)
+                f.write(_HEADER.pack(_MAGIC, _VERSION))
+            elif os.fstat(f.fileno()).st_size != end:
+                f.truncate(end)
+            f.write(_FRAME.pack(date.isoformat().encode("ascii"), len(data)))
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+
+
+__all__ = ["Archive"]
@@ -0,0 +1,184 @@
+import argparse
+import json
+import platform
+import sys
+import time
+from pathlib import Path
+
+from tankbot import serde, synthetic
+from tankbot.analysis import playoffs as playoffs_analysis
+from tankbot.analysis import tank as tank_analysis
+from tankbot.api import assign_lottery_odds
+from tankbot.generate import playoffs as playoffs_generate
+from tankbot.generate import tank as tank_generate
+from tankbot.standings import compute_standings
+from tankbot.util import f, template
+
+FIXTURES = Path(__file__).resolve().parent.parent / "tests"
+DEFAULT_THRESHOLD = 0.25  # slowdown over the baseline flagged as a regression
+SAMPLE_TEAMS = 31  # teams analysed and rendered in a synthetic league, whatever its size
+
+
+def measure(func, repeat):
+    # best and mean time of `repeat` calls, in milliseconds
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append((time.perf_counter() - start) * 1000)
+    return min(times), sum(times) / len(times)
+
+
+def _load(path):
+    info = serde.loadf(path)
+    assign_lottery_odds(info.standings)
+    assign_lottery_odds(info.past_standings)
+    return info
+
+
+def _generate_playoffs(analyses):
+    # a run starts without any of the shared sections rendered
+    for a in analyses:
+        a.view.fragments.clear()
+    for a in analyses:
+        playoffs_generate.generate(a)
+
+
+def info_cases(info, teams):
+    # (case name, function) pairs over the info, analyses and posts for `teams`
+    data = serde.dumpb(info)
+    tank_analyses = [tank_analysis.Analysis(info, team) for team in teams]
+    # the posts of a run share the views of the conferences, as render_posts does
+    playoffs_analyses = playoffs_analysis.analyze_all(info, teams)
+    docs = [tank_generate.make_document(a) for a in tank_analyses]
+    docs += [playoffs_generate.make_document(a) for a in playoffs_analyses]
+
+    return [
+        ("serde.loadb", lambda: serde.loadb(data)),
+        ("serde.dumpb", lambda: serde.dumpb(info)),
+        ("analysis.tank.Analysis", lambda: [tank_analysis.Analysis(info, team) for team in teams]),
+        ("analysis.playoffs.Analysis", lambda: [playoffs_analysis.Analysis(info, team) for team in teams]),
+        ("generate.tank.generate", lambda: [tank_generate.generate(a) for a in tank_analyses]),
+        ("generate.playoffs.generate", lambda: _generate_playoffs(playoffs_analyses)),
+        ("markdown.Document.render", lambda: [doc.render() for doc in docs]),
+    ]
+
+
+def fixture_cases(path):
+    # (case name, function) pairs over every team of the fixture
+    info = _load(path)
+    return [("serde.loadf", lambda: serde.loadf(path))] + info_cases(info, info.teams)
+
+
+def synthetic_cases(teams, seed=0):
+    # (case name, function) pairs over a synthetic league halfway through its season, only a sample of its teams is
+    # analysed so that the cases measure how the per-team work grows with the league
+    league = synthetic.make_league(teams, seed=seed)
+    info = league.info()
+    text = serde.dumps(info)
+    sample = info.teams[:: max(1, len(info.teams) // SAMPLE_TEAMS)][:SAMPLE_TEAMS]
+
+    return [
+        ("serde.loads", lambda: serde.loads(text)),
+        ("serde.dumps", lambda: serde.dumps(info)),
+        ("standings.compute_standings", lambda: compute_standings(league.teams, league.results, league.date)),
+        ("api.Info", league.info),
+    ] + info_cases(info, sample)
+
+
+def format_cases(calls=10000):
+    # formatting in the caller's namespace versus a compiled template, `calls` times
+    class S:
+        points = 57
+        gamesPlayed = 50
+
+    point_percent = template("{points / (gamesPlayed * 2):0.3f}", "points", "gamesPlayed")
+
+    def caller_namespace(s=S()):
+        for _ in range(calls):
+            f("{s.points / (s.gamesPlayed * 2):0.3f}")
+
+    def compiled(s=S()):
+        for _ in range(calls):
+            point_percent(s.points, s.gamesPlayed)
+
+    return [("util.f", caller_namespace), ("util.template", compiled)]
+
+
+def run_suite(paths, repeat, sizes=()):
+    results = []
+    suites = [(Path(path).name, fixture_cases, path) for path in paths]
+    suites += [("synthetic-{}".format(size), synthetic_cases, size) for size in sizes]
+    for fixture, cases, arg in suites:
+        for case, func in cases(arg):
+            best, mean = measure(func, repeat)
+            results.append({"case": case, "fixture": fixture, "best_ms": best, "mean_ms": mean})
+    for case, func in format_cases():
+        best, mean = measure(func, repeat)
+        results.append({"case": case, "fixture": "-", "best_ms": best, "mean_ms": mean})
+    return results
+
+
+def compare(baseline, results, threshold=DEFAULT_THRESHOLD):
+    # results slower than their baseline by more than the threshold, compared on the best times
+    before = {(r["case"], r["fixture"]): r for r in baseline["results"]}
+    regressions = []
+    for r in results:
+        base = before.get((r["case"], r["fixture"]))
+        if base is not None and r["best_ms"] > base["best_ms"] * (1 + threshold):
+            regressions.append(dict(r, baseline_ms=base["best_ms"], change=r["best_ms"] / base["best_ms"] - 1))
+    return regressions
+
+
+def print_rows(rows, file=sys.stdout):
+    columns = list(rows[0])
+    widths = [max(len(c), *(len(_cell(r[c])) for r in rows)) for c in columns]
+    print("  ".join(c.ljust(w) for c, w in zip(columns, widths)).rstrip(), file=file)
+    for row in rows:
+        print("  ".join(_cell(row[c]).ljust(w) for c, w in zip(columns, widths)).rstrip(), file=file)
+
+
+def _cell(value):
+    return "{:.3f}".format(value) if isinstance(value, float) else str(value)
+
+
+def _sizes(s):
+    return [int(size) for size in s.split(",") if size]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="tankbot bench")
+    parser.add_argument("fixtures", nargs="*", help="serialized Info files, defaults to the test fixtures")
+    parser.add_argument("--repeat", default=20, type=int, help="number of runs of each case")
+    parser.add_argument("--json", default=None, help="write the results to this file")
+    parser.add_argument(
+        "--synthetic",
+        default=[],
+        type=_sizes,
+        help="comma separated team counts of synthetic leagues to run the cases on as well, e.g. 31,124,496",
+    )
+    parser.add_argument("--compare", default=None, help="results of a previous run to compare against")
+    parser.add_argument(
+        "--threshold", default=DEFAULT_THRESHOLD, type=float, help="slowdown flagged as a regression, 0.25 is 25%%"
+    )
+    args = parser.parse_args(argv)
+
+    paths = args.fixtures or sorted(str(p) for p in FIXTURES.glob("info*.json"))
+    results = run_suite(paths, args.repeat, args.synthetic)
+    print_rows(results)
+
+    if args.json:
+        report = {"python": platform.python_version(), "repeat": args.repeat, "results": results}
+        Path(args.json).write_text(json.dumps(report, indent=2))
+
+    if args.compare:
+        regressions = compare(json.loads(Path(args.compare).read_text()), results, args.threshold)
+        if regressions:
+            print("\nregressions over {:.0%}:".format(args.threshold), file=sys.stderr)
+            print_rows(regressions, file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
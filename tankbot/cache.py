@@ -0,0 +1,71 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+
+def make_key(endpoint, params):
+    return "{}?{}".format(endpoint, "&".join("{}={}".format(k, params[k]) for k in sorted(params)))
+
+
+class MemoryCache:
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires, value = entry
+        if expires is not None and expires < time.time():
+            return None
+        return value
+
+    def set(self, key, value, ttl=None):
+        expires = None if ttl is None else time.time() + ttl
+        with self._lock:
+            self._entries[key] = (expires, value)
+
+
+# One JSON file per key in a directory. Entries are written to a temporary file and renamed into place, so a
+# concurrent run (e.g. the timer and a manual run) either sees the previous entry or the new one, never a partial write.
+class FileCache:
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+
+    def _entry_path(self, key):
+        return self.path / (hashlib.sha1(key.encode("utf-8")).hexdigest() + ".json")
+
+    def get(self, key):
+        try:
+            entry = json.loads(self._entry_path(key).read_text())
+        except (OSError, ValueError):
+            return None
+        expires = entry.get("expires")
+        if entry.get("key") != key or (expires is not None and expires < time.time()):
+            return None
+        return entry["value"]
+
+    def set(self, key, value, ttl=None):
+        expires = None if ttl is None else time.time() + ttl
+        text = json.dumps({"key": key, "expires": expires, "value": value})
+        fd, tmp = tempfile.mkstemp(dir=str(self.path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                f.write(text)
+            os.replace(tmp, str(self._entry_path(key)))
+        except BaseException:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            raise
+
+
+__all__ = ["make_key", "MemoryCache", "FileCache"]
@@ -0,0 +1,80 @@
+import sys
+import time
+import traceback
+
+import arrow
+
+from .api import all_final
+
+HOUR = 60 * 60
+GAME_LENGTH = 3 * HOUR  # from the start of a game until it is most likely over
+POLL_INTERVAL = 10 * 60  # between checks of whether the night's games are all final
+RETRY_INTERVAL = 15 * 60  # after a run that failed
+GIVE_UP_HOUR = 12  # stop waiting for the night's games to be final at noon the next day
+
+
+def next_wake(info, morning=8):
+    # when the last game of the info's day should be over, or the next morning when there are no games
+    if info.games:
+        return max(game.time for game in info.games).shift(seconds=GAME_LENGTH)
+    return info.date.shift(days=1).floor("day").replace(hour=morning)
+
+
+def _sleep_until(when, sleep, now):
+    delay = (when - now()).total_seconds()
+    if delay > 0:
+        sleep(delay)
+
+
+def _wait_for_final(client, info, sleep, now):
+    # polls the schedule of the info's day until every game is final
+    limit = info.date.shift(days=1).floor("day").replace(hour=GIVE_UP_HOUR)
+    while now() < limit:
+        try:
+            if all_final(client, info.date):
+                return
+        except Exception:
+            traceback.print_exc()
+        sleep(POLL_INTERVAL)
+
+
+# Runs the bot for each day as soon as the previous night's games are over, instead of at a fixed hour.
+#
+# `run` takes the date to analyse (None for today) and returns the fetched info. Everything it keeps between calls
+# (API client, teams, reddit session) stays warm for the lifetime of the process. When given, `live` follows the games
+# of the info until they are over instead of sleeping through them.
+def run_daemon(run, client, morning=8, sleep=time.sleep, now=arrow.now, runs=None, live=None):
+    date = None
+    info = None
+    while runs is None or runs > 0:
+        try:
+            info = run(date)
+        except Exception:
+            # the API or reddit being down should not bring the daemon down, the same day is tried again later
+            traceback.print_exc()
+            sleep(RETRY_INTERVAL)
+            continue
+        if runs is not None:
+            runs -= 1
+            if runs == 0:
+                break
+
+        if live is not None and info.games:
+            _sleep_until(min(game.time for game in info.games), sleep, now)
+            try:
+                live(info)
+            except Exception:
+                traceback.print_exc()
+        wake = next_wake(info, morning)
+        print("next run at", wake.isoformat(), file=sys.stderr)
+        _sleep_until(wake, sleep, now)
+        if info.games:
+            _wait_for_final(client, info, sleep, now)
+        # the posts of a day are about the results of the night before
+        date = info.date.shift(days=1).floor("day")
+        if date < now().floor("day"):
+            date = None
+    return info
+
+
+__all__ = ["next_wake", "run_daemon"]
@@ -2,8 +2,11 @@ import typing
 
 from ..analysis.tank import Analysis, Matchup
 from ..api import Standing
-from ..markdown import H1, H2, Document, HorizontalRule, List, Paragraph, Table
-from ..util import f
+from ..markdown import H1, H2, Document, HorizontalRule, List, Paragraph, Raw, Table
+from ..util import f, template
+
+# heading of the section on tonight's games, live scores are shown right above it
+TONIGHT = "Tonight's race"
 
 
 def fmt_team(team):
@@ -16,8 +19,11 @@ def fmt_vs(away, home):
     return f("{} at {}", fmt_team(away), fmt_team(home))
 
 
+_fmt_seed = template("[](/r/{s.team.subreddit}) {s.team.code.upper()} ({s.place})", "s")
+
+
 def fmt_seed(s: Standing):
-    return f("[](/r/{s.team.subreddit}) {s.team.code.upper()} ({s.place})")
+    return _fmt_seed(s)
 
 
 def get_cheer(a: Analysis, m: Matchup):
@@ -99,7 +105,31 @@ def make_games_table(a: Analysis, games):
     return t
 
 
-def generate(a: Analysis):
+# The standings and playoffs matchups sections are the same for every team of a division. They are rendered once per
+# version of the standings and kept on the conference view shared by the analyses of a run.
+def make_shared_sections(a: Analysis):
+    key = (a.my_team.division, a.info.standings_version)
+    text = a.view.fragments.get(key)
+    if text is None:
+        doc = Document()
+
+        # standings
+        doc.add(H2("Standings"))
+        doc.add(make_standings_table(a.own_division))
+        doc.add(make_standings_table(a.other_division))
+        doc.add(make_wildcard_table(a.wildcard))
+        doc.add(HorizontalRule())
+
+        # playoffs matchups
+        doc.add(H2("Current playoffs matchups"))
+        doc.add(make_matchups_table(a))
+        doc.add(HorizontalRule())
+
+        text = a.view.fragments[key] = doc.render()
+    return Raw(text)
+
+
+def make_document(a: Analysis):
     doc = Document()
     doc.add(H1("Race to the Playoffs"))
 
@@ -123,22 +153,13 @@ def generate(a: Analysis):
         doc.add(Paragraph("Nothing out of town."))
     doc.add(HorizontalRule())
 
-    # standings
-    doc.add(H2("Standings"))
-    doc.add(make_standings_table(a.own_division))
-    doc.add(make_standings_table(a.other_division))
-    doc.add(make_wildcard_table(a.wildcard))
-    doc.add(HorizontalRule())
-
-    # playoffs matchups
-    doc.add(H2("Current playoffs matchups"))
-    doc.add(make_matchups_table(a))
-    doc.add(HorizontalRule())
+    # standings and playoffs matchups
+    doc.add(make_shared_sections(a))
 
     # games
 
     # own game
-    doc.add(H2("Tonight's race"))
+    doc.add(H2(TONIGHT))
     doc.add(List(["Our race:"]))
     if a.my_game:
         t = make_games_table(a, [a.my_game])
@@ -162,4 +183,8 @@ They are FOSS and their source code is available [here](https://github.com/reddi
         )
     )
 
-    return doc.render()
+    return doc
+
+
+def generate(a: Analysis):
+    return make_document(a).render()
@@ -2,6 +2,9 @@ from ..analysis.tank import Analysis, Matchup
 from ..markdown import H1, H2, Document, HorizontalRule, List, Paragraph, Table
 from ..util import f
 
+# heading of the section on tonight's games, live scores are shown right above it
+TONIGHT = "Tonight's tank"
+
 
 def fmt_team(team):
     # return f"[](/r/{team.subreddit}) {team.code.upper()}"
@@ -38,11 +41,19 @@ def make_result_table(a: Analysis, results):
     return t
 
 
+def fmt_draft_odds(a: Analysis, team):
+    odds = a.draft_odds.get(team)
+    if odds is None:
+        return "-", "-"
+    return f("{:0.1f}", odds.top3 * 100), f("{:0.1f}", odds.expected)
+
+
 def make_standings_table(a: Analysis):
     t = Table()
-    t.add_columns("Place", "Team", "GP", "Record", "Points", "ROW", "L10", "1st OA odds")
+    t.add_columns("Place", "Team", "GP", "Record", "Points", "ROW", "L10", "1st OA odds", "Top 3 odds", "Exp. pick")
     for s in a.standings:
-        t.add_row(s.place, fmt_team(s.team), s.gamesPlayed, s.record, s.points, s.row, s.last10, s.odds)
+        top3, expected = fmt_draft_odds(a, s.team)
+        t.add_row(s.place, fmt_team(s.team), s.gamesPlayed, s.record, s.points, s.row, s.last10, s.odds, top3, expected)
     return t
 
 
@@ -54,7 +65,7 @@ def make_games_table(a: Analysis, games):
     return t
 
 
-def generate(a: Analysis):
+def make_document(a: Analysis):
     doc = Document()
     doc.add(H1("Scouting the Tank"))
 
@@ -91,7 +102,7 @@ def generate(a: Analysis):
     # games
 
     # own game
-    doc.add(H2("Tonight's tank"))
+    doc.add(H2(TONIGHT))
     doc.add(List(["De Tanque:"]))
     if a.my_game:
         t = make_games_table(a, [a.my_game])
@@ -107,4 +118,8 @@ def generate(a: Analysis):
     else:
         doc.add(Paragraph("Nothing out of town."))
 
-    return doc.render()
+    return doc
+
+
+def generate(a: Analysis):
+    return make_document(a).render()
@@ -0,0 +1,211 @@
+import bisect
+from collections import defaultdict
+from pathlib import Path
+
+import arrow
+
+from . import serde
+from .api import Result, is_called_off, parse_game, parse_result
+from .util import as_date
+
+
+def season_bounds(date):
+    # regular seasons start in October and are over by the end of June
+    date = as_date(date)
+    year = date.year if date.month >= 8 else date.year - 1
+    return arrow.get(year, 10, 1).date(), arrow.get(year + 1, 6, 30).date()
+
+
+def _is_final(entry):
+    return entry.status.abstractGameState == "Final"
+
+
+def _key_of(entry):
+    # removed keys are written as lists, game ids as numbers
+    return tuple(entry) if isinstance(entry, list) else entry
+
+
+def _is_regular(entry):
+    return getattr(entry, "gameType", "R") == "R"
+
+
+# Every game of a season, scheduled or final, indexed by date and by team.
+#
+# The ledger is persisted as an append-only JSON lines file. Each sync only appends the games that changed and a
+# marker of the last date for which every game is final or called off, so the next sync resumes from there. Games are
+# keyed by their game id, a postponed game keeps it when it is rescheduled. The ledger can span seasons, queries never
+# look past the season of the date they are given.
+class Ledger:
+    def __init__(self, path=None):
+        self.path = Path(path) if path is not None else None
+        self.synced = None  # last date for which every game is final or called off
+        self._games = {}  # key -> game or result
+        self._date_of = {}  # key -> date of the game
+        self._dates = []  # sorted dates that have games
+        self._by_date = defaultdict(dict)  # date -> key -> game or result
+        self._by_team = defaultdict(dict)  # team id -> key -> game or result
+        if self.path is not None and self.path.exists():
+            self._load()
+
+    @staticmethod
+    def _key(date, game, pk=None):
+        # entries written before game ids were kept are keyed by date and teams
+        return pk if pk is not None else (date.isoformat(), game.home.id, game.away.id)
+
+    def _load(self):
+        with self.path.open() as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    self._replay(serde.loads(line))
+
+    def _replay(self, entry):
+        if "game" in entry:
+            date = arrow.get(entry["date"]).date()
+            self._put(date, entry["game"], self._key(date, entry["game"], entry.get("pk")))
+        elif "removed" in entry:
+            self._remove(_key_of(entry["removed"]))
+        elif "synced" in entry:
+            self.synced = arrow.get(entry["synced"]).date()
+
+    def _put(self, date, game, key):
+        old = self._games.get(key)
+        if old == game and self._date_of[key] == date:
+            return False
+        if old is not None:
+            # rescheduled
+            self._remove(key)
+        if date not in self._by_date:
+            bisect.insort(self._dates, date)
+        self._games[key] = game
+        self._date_of[key] = date
+        self._by_date[date][key] = game
+        self._by_team[game.home.id][key] = game
+        self._by_team[game.away.id][key] = game
+        return True
+
+    def _remove(self, key):
+        game = self._games.pop(key, None)
+        if game is None:
+            return
+        date = self._date_of.pop(key)
+        del self._by_date[date][key]
+        if not self._by_date[date]:
+            del self._by_date[date]
+            del self._dates[bisect.bisect_left(self._dates, date)]
+        del self._by_team[game.home.id][key]
+        del self._by_team[game.away.id][key]
+
+    def _append(self, entries):
+        if self.path is None or not entries:
+            return
+        text = "".join(serde.dumps(entry) + "\n" for entry in entries)
+        with self.path.open("a") as f:
+            f.write(text)
+
+    def sync(self, client, info, until, start=None, end=None):
+        # fetch every day missing since the last sync, up to `until`, in a single ranged request
+        # `start` forces a backfill from an earlier date, `end` fetches the schedule further than `until`
+        until = as_date(until)
+        season_start, season_end = season_bounds(until)
+        # a ledger synced during an earlier season starts over like a first sync
+        previous = self.synced if self.synced is not None and self.synced >= season_start else None
+        if start is None:
+            if previous is None:
+                start = season_start
+                # the first sync also downloads the rest of the season's schedule
+                if end is None:
+                    end = season_end
+            else:
+                start = arrow.get(self.synced).shift(days=1).date()
+        start = as_date(start)
+        end = max(as_date(end), until) if end is not None else until
+        if start > end:
+            return 0
+
+        data = client.schedule(start_date=start.isoformat(), end_date=end.isoformat(), expand="schedule.linescore")
+
+        entries = []
+        synced = previous
+        complete = True
+        seen = set()
+        for day in data.dates:
+            date = arrow.get(day.date).date()
+            for entry in day.games:
+                if not _is_regular(entry):
+                    continue
+                final = _is_final(entry)
+                if not final and is_called_off(entry):
+                    # not played on this date, it is dropped below and comes back when it is rescheduled
+                    continue
+                game = parse_result(info, entry) if final else parse_game(info, entry)
+                pk = entry.get("gamePk")
+                key = self._key(date, game, pk)
+                seen.add(key)
+                if self._put(date, game, key):
+                    entries.append({"date": date.isoformat(), "pk": pk, "game": game})
+                complete = complete and final
+            if complete and date < until:
+                synced = date
+
+        # games that are no longer on the schedule in the fetched range were postponed or moved
+        for date in self._dates[bisect.bisect_left(self._dates, start) : bisect.bisect_right(self._dates, end)]:
+            for key, game in list(self._by_date[date].items()):
+                if key not in seen and not isinstance(game, Result):
+                    self._remove(key)
+                    entries.append({"removed": list(key) if isinstance(key, tuple) else key})
+
+        if complete:
+            # days without any game count as complete too
+            synced = arrow.get(until).shift(days=-1).date()
+        if synced is not None and synced != self.synced:
+            self.synced = synced
+            entries.append({"synced": synced.isoformat()})
+
+        self._append(entries)
+        return len(entries)
+
+    def games(self):
+        return [game for date in self._dates for game in self._by_date[date].values()]
+
+    def results(self):
+        return [game for game in self.games() if isinstance(game, Result)]
+
+    def games_on(self, date):
+        return sorted(self._by_date.get(as_date(date), {}).values(), key=lambda g: g.time)
+
+    def results_on(self, date):
+        return [game for game in self.games_on(date) if isinstance(game, Result)]
+
+    def games_between(self, start, end):
+        # games on every date from start to end, inclusive
+        lo = bisect.bisect_left(self._dates, as_date(start))
+        hi = bisect.bisect_right(self._dates, as_date(end))
+        return [game for date in self._dates[lo:hi] for game in self._by_date[date].values()]
+
+    def results_before(self, date):
+        # results of the season strictly before the given date
+        date = as_date(date)
+        lo = bisect.bisect_left(self._dates, season_bounds(date)[0])
+        hi = bisect.bisect_left(self._dates, date)
+        return [
+            game for date in self._dates[lo:hi] for game in self._by_date[date].values() if isinstance(game, Result)
+        ]
+
+    def remaining(self, date):
+        # games not played yet, from the given date to the end of its season
+        date = as_date(date)
+        lo = bisect.bisect_left(self._dates, date)
+        hi = bisect.bisect_right(self._dates, season_bounds(date)[1])
+        return [
+            game for date in self._dates[lo:hi] for game in self._by_date[date].values() if not isinstance(game, Result)
+        ]
+
+    def games_for(self, team):
+        return list(self._by_team.get(team.id, {}).values())
+
+    def results_for(self, team):
+        return [game for game in self.games_for(team) if isinstance(game, Result)]
+
+
+__all__ = ["Ledger", "season_bounds"]
@@ -0,0 +1,213 @@
+import sys
+import time
+import traceback
+
+import arrow
+import requests
+from attr import attrib, attrs, evolve
+
+from .api import _bag, is_called_off, parse_result
+from .daemon import GIVE_UP_HOUR
+from .generate import playoffs, tank
+from .generate.playoffs import fmt_vs
+from .markdown import H2, Table
+from .posts import PLAYOFFS, TANK
+from .util import f
+
+SCHEDULE_URL = "https://statsapi.web.nhl.com/api/v1/schedule"
+
+PREVIEW = "Preview"
+LIVE = "Live"
+FINAL = "Final"
+CALLED_OFF = "Called off"  # postponed or cancelled, the schedule keeps those in Preview
+DONE = (FINAL, CALLED_OFF)
+
+LIVE_INTERVAL = 30  # seconds between polls while a game is on
+IDLE_INTERVAL = 15 * 60  # longest wait for the next game to start
+
+# heading the live scores section is inserted above
+_ANCHORS = {PLAYOFFS: H2(playoffs.TONIGHT).markdown(), TANK: H2(tank.TONIGHT).markdown()}
+
+
+# Polls the schedule with its linescores for every game of a day in a single request.
+#
+# Requests are conditional, an unchanged schedule is answered with a 304 and an empty body, so the polling rate does not
+# depend on the number of teams configured.
+class ScoreFeed:
+    def __init__(self, session=None, url=SCHEDULE_URL):
+        self.session = session if session is not None else requests.Session()
+        self.url = url
+        self.requests = 0
+        self.not_modified = 0
+        self._validators = {}  # date -> headers of the last response used to revalidate it
+
+    def poll(self, date):
+        # the games of the date, None when nothing changed since the last poll
+        day = date.format("YYYY-MM-DD")
+        headers = self._validators.get(day, {})
+        self.requests += 1
+        resp = self.session.get(
+            self.url, params={"date": day, "expand": "schedule.linescore"}, headers=headers, timeout=30
+        )
+        if resp.status_code == 304:
+            self.not_modified += 1
+            return None
+        resp.raise_for_status()
+        validators = {}
+        if resp.headers.get("ETag"):
+            validators["If-None-Match"] = resp.headers["ETag"]
+        if resp.headers.get("Last-Modified"):
+            validators["If-Modified-Since"] = resp.headers["Last-Modified"]
+        self._validators[day] = validators
+        data = _bag(resp.json())
+        return [entry for d in data.dates for entry in d.games]
+
+
+@attrs(slots=True)
+class LiveGame:
+    game = attrib()  # game of the info
+    state = attrib(default=PREVIEW)
+    away_score = attrib(default=0)
+    home_score = attrib(default=0)
+    period = attrib(default="")  # period while the game is on, why it was called off
+    result = attrib(default=None)  # result once the game is final
+
+
+def _key(game):
+    return (game.home.id, game.away.id)
+
+
+def update_games(info, live, entries):
+    # applies the polled entries to the live games, returns the keys of the games that changed
+    changed = set()
+    for entry in entries:
+        key = (entry.teams.home.team.id, entry.teams.away.team.id)
+        lg = live.get(key)
+        if lg is None or lg.state in DONE:
+            continue
+        state = entry.status.abstractGameState
+        linescore = getattr(entry, "linescore", None)
+        # the time remaining is left out, it changes on every poll and would have every thread edited every time
+        period = ""
+        if state == PREVIEW and is_called_off(entry):
+            state, period = CALLED_OFF, entry.status.detailedState
+        elif state == LIVE and linescore is not None:
+            period = getattr(linescore, "currentPeriodOrdinal", "")
+        away_score = entry.teams.away.get("score", 0)
+        home_score = entry.teams.home.get("score", 0)
+        if (state, away_score, home_score, period) == (lg.state, lg.away_score, lg.home_score, lg.period):
+            continue
+        lg.state, lg.away_score, lg.home_score, lg.period = state, away_score, home_score, period
+        if state == FINAL and linescore is not None:
+            lg.result = parse_result(info, entry)
+        changed.add(key)
+    return changed
+
+
+def next_interval(live, now):
+    # fast while a game is on or about to start, idle until the next start otherwise, None once every game is over
+    starts = []
+    for lg in live.values():
+        if lg.state == LIVE:
+            return LIVE_INTERVAL
+        if lg.state not in DONE:
+            starts.append(lg.game.time)
+    if not starts:
+        return None
+    wait = (min(starts) - now).total_seconds()
+    return min(max(wait, LIVE_INTERVAL), IDLE_INTERVAL)
+
+
+def _finished(m, result):
+    # the matchup of a game that just ended, moods are only computed on results
+    done = evolve(m, game=result)
+    done.ideal_winner = m.ideal_winner
+    return done
+
+
+# The thread of a post during the night. A live scores section is spliced into the post as it was submitted, the thread
+# is only edited when a score or a mood of one of its games changed.
+class LiveThread:
+    def __init__(self, kind, analysis, markdown, submission_id):
+        self.kind = kind
+        self.team = analysis.my_team
+        self.markdown = markdown
+        self.submission_id = submission_id
+        self.matchups = ([analysis.my_game] if analysis.my_game else []) + list(analysis.games)
+        self.moods = {}  # game key -> mood, computed once when the game ends
+        self._last = None
+
+    def _rows(self, live):
+        rows = []
+        for m in self.matchups:
+            key = _key(m.game)
+            lg = live.get(key)
+            if lg is None:
+                continue
+            if lg.result is not None and key not in self.moods:
+                self.moods[key] = _finished(m, lg.result).get_mood()
+            if lg.state == PREVIEW:
+                score = m.time
+            elif lg.state == CALLED_OFF:
+                score = lg.period
+            elif lg.result is not None:
+                ot = "(SO)" if lg.result.shootout else "(OT)" if lg.result.overtime else ""
+                score = f("{}-{} Final {}", lg.away_score, lg.home_score, ot).strip()
+            else:
+                score = f("{}-{} {}", lg.away_score, lg.home_score, lg.period).strip()
+            mood = self.moods.get(key)
+            rows.append((m.game, score, str(mood) if mood is not None else "-"))
+        return rows
+
+    def render(self, live):
+        # the new text of the thread, None when nothing shown in it changed
+        rows = self._rows(live)
+        signature = tuple((_key(game), score, mood) for game, score, mood in rows)
+        if not rows or signature == self._last:
+            return None
+        self._last = signature
+
+        t = Table()
+        t.add_columns("Game", "Score", "Yay?")
+        for game, score, mood in rows:
+            t.add_row(fmt_vs(game.away, game.home), score, mood)
+        section = H2("Live scores").markdown() + t.markdown() + "***\n"
+
+        # right above tonight's games, at the end of a post without them
+        cut = self.markdown.find(_ANCHORS[self.kind])
+        if cut < 0:
+            return self.markdown + "***\n" + section
+        return self.markdown[:cut] + section + self.markdown[cut:]
+
+
+# Follows the games of the info's day until they are all over, publishing the threads whose text changed.
+#
+# Following stops at GIVE_UP_HOUR the next day whatever the state of the games, so that a game that never starts or a
+# schedule that cannot be fetched does not hold up the next day's run.
+def follow(info, threads, publish, feed=None, sleep=time.sleep, now=arrow.now):
+    feed = feed if feed is not None else ScoreFeed()
+    live = {_key(game): LiveGame(game) for game in info.games}
+    limit = info.date.shift(days=1).floor("day").replace(hour=GIVE_UP_HOUR)
+    while True:
+        if now() >= limit:
+            print("live: giving up, games still not over at", limit.isoformat(), file=sys.stderr)
+            break
+        try:
+            entries = feed.poll(info.date)
+        except Exception:
+            traceback.print_exc()
+            entries = None
+        if entries is not None and update_games(info, live, entries):
+            for thread in threads:
+                text = thread.render(live)
+                if text is not None:
+                    publish(thread, text)
+        interval = next_interval(live, now())
+        if interval is None:
+            break
+        sleep(interval)
+    print("live: {} request(s), {} not modified".format(feed.requests, feed.not_modified), file=sys.stderr)
+    return live
+
+
+__all__ = ["ScoreFeed", "LiveGame", "LiveThread", "update_games", "next_interval", "follow"]
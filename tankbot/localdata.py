@@ -51,3 +51,42 @@ _LOTTERY = """\
 1.0
 """
 lottery = list(map(float, _LOTTERY.splitlines()))
+
+_LOTTERY_2019 = """\
+18.5
+13.5
+11.5
+9.5
+8.5
+7.5
+6.5
+6.0
+5.0
+3.5
+3.0
+2.5
+2.0
+1.5
+1.0
+"""
+lottery_2019 = list(map(float, _LOTTERY_2019.splitlines()))
+
+_LOTTERY_2022 = """\
+18.5
+13.5
+11.5
+9.5
+8.5
+7.5
+6.5
+6.0
+5.0
+3.5
+3.0
+2.5
+2.0
+1.5
+0.5
+0.5
+"""
+lottery_2022 = list(map(float, _LOTTERY_2022.splitlines()))
@@ -0,0 +1,114 @@
+from functools import lru_cache
+
+from attr import attrib, attrs
+
+from . import localdata
+
+
+@attrs(slots=True, frozen=True)
+class LotteryRules:
+    odds = attrib(converter=tuple)  # chances of winning a draw in percent, worst team first
+    draws = attrib(default=3)  # number of picks decided by a draw
+    max_jump = attrib(default=None)  # maximum number of spots a team can move up, None for no limit
+
+
+# rules by first draft year they applied to
+RULES = {
+    2017: LotteryRules(localdata.lottery, draws=3),
+    2019: LotteryRules(localdata.lottery_2019, draws=3),
+    2022: LotteryRules(localdata.lottery_2022, draws=2, max_jump=10),
+}
+DEFAULT_RULES = RULES[2017]
+
+
+@attrs(slots=True, frozen=True)
+class PickOdds:
+    slots = attrib()  # probability of landing each pick, first overall first
+    top3 = attrib()
+    expected = attrib()
+
+
+def draft_year(date):
+    # the draft closes the season, seasons start in October
+    return date.year + 1 if date.month >= 8 else date.year
+
+
+def rules_for(date):
+    year = draft_year(date)
+    eligible = [y for y in RULES if y <= year]
+    return RULES[max(eligible)] if eligible else DEFAULT_RULES
+
+
+def _landing(rules, rank, draw):
+    # the pick of the team ranked `rank` (0 is the worst) winning draw `draw` (0 is first overall), a team can only
+    # move up `max_jump` spots
+    if rules.max_jump is None or rank - rules.max_jump <= draw:
+        return draw
+    return rank - rules.max_jump
+
+
+@lru_cache(maxsize=None)
+def slot_odds(rules):
+    # Exact probability of the team ranked r (0 is the worst) landing pick p, as a matrix indexed [r][p].
+    #
+    # The draws are walked with dynamic programming over the picks already handed out: the odds of the next draw only
+    # depend on which teams hold which picks, not on the order they were drawn in, so sequences that lead to the same
+    # picks collapse into a single state. Every team without a pick takes part in a draw. A winner that would move up
+    # more than `max_jump` spots moves up `max_jump` spots instead and the drawn pick goes to the worst team without a
+    # pick. The draw of a pick already taken by such a team is not held. After the last draw the teams without a pick
+    # fill the picks left in order of their ranking.
+    n = len(rules.odds)
+    draws = min(rules.draws, n)
+    probs = [[0.0] * n for _ in range(n)]
+
+    states = {frozenset(): 1.0}  # (rank, pick) pairs handed out -> probability
+    for draw in range(draws):
+        following = {}
+        for picks, p in states.items():
+            if any(pick == draw for _, pick in picks):
+                following[picks] = following.get(picks, 0.0) + p
+                continue
+            holders = {r for r, _ in picks}
+            candidates = [r for r in range(n) if r not in holders]
+            total = sum(rules.odds[r] for r in candidates)
+            for r in candidates:
+                # nobody left with a chance, the pick goes to the worst team left
+                w = rules.odds[r] / total if total else float(r == candidates[0])
+                if not w:
+                    continue
+                landing = _landing(rules, r, draw)
+                if landing == draw:
+                    key = picks | {(r, draw)}
+                else:
+                    key = picks | {(candidates[0], draw), (r, landing)}
+                following[key] = following.get(key, 0.0) + p * w
+        states = following
+
+    for picks, p in states.items():
+        for r, pick in picks:
+            probs[r][pick] += p
+        holders = {r for r, _ in picks}
+        taken = {pick for _, pick in picks}
+        left = [pick for pick in range(n) if pick not in taken]
+        for r, pick in zip((r for r in range(n) if r not in holders), left):
+            probs[r][pick] += p
+
+    return tuple(tuple(row) for row in probs)
+
+
+def _summarize(row):
+    return PickOdds(slots=row, top3=sum(row[:3]), expected=sum(p * (pick + 1) for pick, p in enumerate(row)))
+
+
+@lru_cache(maxsize=64)
+def _pick_odds(rules, ranking):
+    return {team: _summarize(row) for team, row in zip(ranking, slot_odds(rules))}
+
+
+def pick_odds(standings, rules=DEFAULT_RULES):
+    # odds of every team in the lottery, the worst teams of the league standings
+    ranking = tuple(s.team for s in sorted(standings, key=lambda s: s.place, reverse=True))
+    return _pick_odds(rules, ranking[: len(rules.odds)])
+
+
+__all__ = ["LotteryRules", "PickOdds", "RULES", "DEFAULT_RULES", "rules_for", "slot_odds", "pick_odds"]
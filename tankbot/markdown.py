@@ -2,13 +2,6 @@ from io import StringIO
 from functools import partial
 
 
-def iter_first(iterable):
-    first = True
-    for item in iterable:
-        yield (first, item)
-        first = False
-
-
 class Buffer:
 
     def __init__(self):
@@ -30,20 +23,26 @@ class Document:
         self.items = []
 
     def add(self, item):
-        self.items.append(item)
+        # anything that is not an element renders to nothing
+        if isinstance(item, Element):
+            self.items.append(item)
 
     def render(self):
-        b = Buffer()
-        for item in self.items:
-            if isinstance(item, Element):
-                item.render(b)
-        return b.text()
+        return "".join([item.markdown() for item in self.items])
 
 
+# Elements produce their whole markdown at once with markdown(), render() writes it to a buffer.
+# Subclasses only overriding render() still work through the default markdown().
 class Element:
 
+    def markdown(self):
+        b = Buffer()
+        self.render(b)
+        return b.text()
+
     def render(self, writer: Buffer):
-        pass
+        if type(self).markdown is not Element.markdown:
+            writer.write(self.markdown())
 
 
 class _Heading(Element):
@@ -52,12 +51,8 @@ class _Heading(Element):
         self.text = text
         self.size = size
 
-    def render(self, w):
-        for _ in range(self.size):
-            w.write("#")
-        w.write(" ")
-        w.write(self.text)
-        w.write("\n")
+    def markdown(self):
+        return "#" * self.size + " " + self.text + "\n"
 
 
 H1 = partial(_Heading, size=1)
@@ -70,8 +65,8 @@ class HorizontalRule(Element):
     def __init__(self):
         pass
 
-    def render(self, w):
-        w.write("***\n")
+    def markdown(self):
+        return "***\n"
 
 
 class Paragraph(Element):
@@ -79,9 +74,8 @@ class Paragraph(Element):
     def __init__(self, text):
         self.text = text
 
-    def render(self, w):
-        w.write(self.text)
-        w.write("\n\n")
+    def markdown(self):
+        return self.text + "\n\n"
 
 
 class Quote(Element):
@@ -89,10 +83,8 @@ class Quote(Element):
     def __init__(self, text):
         self.text = text
 
-    def render(self, w):
-        w.write("> ")
-        w.write(self.text)
-        w.write("\n\n")
+    def markdown(self):
+        return "> " + self.text + "\n\n"
 
 
 class List(Element):
@@ -107,17 +99,22 @@ class List(Element):
     def add(self, text: str):
         self.items.append(text)
 
-    def render(self, w):
-        w.write("\n")
-        for idx, item in enumerate(self.items):
-            if self.numbered:
-                w.write(str(idx + 1))
-                w.write(". ")
-            else:
-                w.write("* ")
-            w.write(item)
-            w.write("\n")
-        w.write("\n")
+    def markdown(self):
+        if self.numbered:
+            lines = ["%d. %s\n" % (idx + 1, item) for idx, item in enumerate(self.items)]
+        else:
+            lines = ["* " + item + "\n" for item in self.items]
+        return "\n" + "".join(lines) + "\n"
+
+
+# Markdown rendered elsewhere, spliced in as is.
+class Raw(Element):
+
+    def __init__(self, text):
+        self.text = text
+
+    def markdown(self):
+        return self.text
 
 
 class Table(Element):
@@ -138,30 +135,22 @@ class Table(Element):
     def add_row(self, *args):
         self.rows.append(tuple(args))
 
-    def render(self, w):
-        for first, column in iter_first(self.columns):
-            if not first:
-                w.write("|")
-            w.write(column)
-        w.write("\n")
-
-        for first, align in iter_first(self.alignments):
-            if not first:
-                w.write("|")
-            if align == "center":
-                w.write(":---:")
-            elif align == "left":
-                w.write(":---")
-            elif align == "right":
-                w.write("---:")
-            else:
-                raise ValueError("invalid value for alignment %s" % align)
-        w.write("\n")
-
-        for row in self.rows:
-            for first, item in iter_first(row):
-                if not first:
-                    w.write("|")
-                w.write(str(item))
-            w.write("\n")
-        w.write("\n")
+    def markdown(self):
+        lines = ["|".join(self.columns), _alignment_row(tuple(self.alignments))]
+        lines.extend(["|".join(map(str, row)) for row in self.rows])
+        return "\n".join(lines) + "\n\n"
+
+
+_ALIGNMENTS = {"center": ":---:", "left": ":---", "right": "---:"}
+_alignment_rows = {}  # column alignments -> alignment row of the table
+
+
+def _alignment_row(alignments):
+    row = _alignment_rows.get(alignments)
+    if row is None:
+        try:
+            row = "|".join(_ALIGNMENTS[align] for align in alignments)
+        except KeyError as e:
+            raise ValueError("invalid value for alignment %s" % e.args[0])
+        _alignment_rows[alignments] = row
+    return row
@@ -0,0 +1,58 @@
+import hashlib
+
+from attr import attrib, attrs
+
+from . import serde
+from .cache import FileCache
+
+
+def input_hash(info, *options):
+    # hash of everything the posts of a day are derived from, the time of the run is left out
+    h = hashlib.sha256()
+    h.update(serde.dumpb([info.date.format("YYYY-MM-DD"), info.teams, info.standings, info.past_standings]))
+    h.update(serde.dumpb([info.games, info.results, list(options)]))
+    return h.hexdigest()
+
+
+@attrs(slots=True)
+class CachedPost:
+    input_hash = attrib()
+    markdown = attrib()
+    submission_id = attrib(default=None)
+
+
+# Rendered posts by (kind, team, date) along with the hash of their inputs and the id of their submission.
+#
+# A post whose inputs did not change since it was rendered and submitted does not need to be rendered or sent again.
+class PostCache:
+    def __init__(self, path):
+        self._files = FileCache(path)
+
+    @staticmethod
+    def _key(kind, code, date):
+        return "{}/{}/{}".format(kind, code.lower(), date.format("YYYY-MM-DD"))
+
+    def get(self, kind, code, date):
+        entry = self._files.get(self._key(kind, code, date))
+        if entry is None:
+            return None
+        return CachedPost(entry["input_hash"], entry["markdown"], entry.get("submission_id"))
+
+    def put(self, kind, code, date, entry: CachedPost):
+        value = {"input_hash": entry.input_hash, "markdown": entry.markdown, "submission_id": entry.submission_id}
+        self._files.set(self._key(kind, code, date), value)
+
+    def is_current(self, kind, code, date, digest, submitted=True):
+        entry = self.get(kind, code, date)
+        if entry is None or entry.input_hash != digest:
+            return False
+        return not submitted or entry.submission_id is not None
+
+    def set_submission(self, kind, code, date, submission_id):
+        entry = self.get(kind, code, date)
+        if entry is not None:
+            entry.submission_id = submission_id
+            self.put(kind, code, date, entry)
+
+
+__all__ = ["input_hash", "CachedPost", "PostCache"]
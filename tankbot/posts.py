@@ -0,0 +1,90 @@
+import multiprocessing
+
+from attr import attrib, attrs
+
+import tankbot.analysis.playoffs
+import tankbot.analysis.tank
+import tankbot.generate.playoffs
+import tankbot.generate.tank
+from tankbot.metrics import NO_METRICS, Metrics
+
+PLAYOFFS = "playoffs"
+TANK = "tank"
+
+_TITLES = {PLAYOFFS: "Playoffs Race: {}", TANK: "Scouting the Tank: {}"}
+
+
+@attrs(slots=True)
+class Post:
+    kind = attrib()
+    team = attrib()
+    title = attrib()
+    text = attrib()
+
+
+def make_title(info, kind):
+    return _TITLES[kind].format(info.date.format("MMMM Do, YYYY"))
+
+
+def analyze(info, kind, team, elimination=None, views=None):
+    # `views` caches the conference views of the playoffs analysis between calls
+    if kind == PLAYOFFS:
+        view = None
+        if views is not None:
+            view = views.get(team.conference)
+            if view is None:
+                view = views[team.conference] = tankbot.analysis.playoffs.ConferenceView(info, team.conference)
+        return tankbot.analysis.playoffs.Analysis(info, team, elimination=elimination, view=view)
+    elif kind == TANK:
+        return tankbot.analysis.tank.Analysis(info, team, elimination=elimination)
+    else:
+        raise ValueError("invalid post kind %s" % kind)
+
+
+def render(info, kind, team, elimination=None, views=None, metrics=NO_METRICS):
+    with metrics.span("analysis", kind=kind):
+        a = analyze(info, kind, team, elimination, views)
+    with metrics.span("generate", kind=kind):
+        if kind == PLAYOFFS:
+            text = tankbot.generate.playoffs.generate(a)
+        else:
+            text = tankbot.generate.tank.generate(a)
+    return Post(kind, team, make_title(info, kind), text)
+
+
+# state of a worker process, the info is sent once when the worker starts instead of with every job
+_worker = None
+
+
+def _init_worker(info, elimination, metered):
+    global _worker
+    _worker = (info, elimination, {}, metered)
+
+
+def _render_job(job):
+    # the spans of the job are sent back with its post
+    info, elimination, views, metered = _worker
+    kind, code = job
+    if not metered:
+        return render(info, kind, info.get_team_by_code(code), elimination, views), None
+    metrics = Metrics()
+    post = render(info, kind, info.get_team_by_code(code), elimination, views, metrics)
+    return post, metrics.samples()
+
+
+def render_posts(info, jobs, processes=1, elimination=None, metrics=NO_METRICS):
+    # yields the posts of the (kind, team code) jobs as soon as they are rendered, in the order they were given
+    if processes > 1 and len(jobs) > 1:
+        metered = isinstance(metrics, Metrics)
+        with multiprocessing.Pool(min(processes, len(jobs)), _init_worker, (info, elimination, metered)) as pool:
+            for post, samples in pool.imap(_render_job, jobs):
+                if samples is not None:
+                    metrics.merge(samples)
+                yield post
+        return
+    views = {}
+    for kind, code in jobs:
+        yield render(info, kind, info.get_team_by_code(code), elimination, views, metrics)
+
+
+__all__ = ["PLAYOFFS", "TANK", "Post", "make_title", "analyze", "render", "render_posts"]
@@ -1,12 +1,19 @@
 import importlib
 import json
+import struct
+from datetime import datetime, timedelta, timezone
 from enum import Enum
+from functools import lru_cache
 from json import JSONEncoder
+from operator import itemgetter
 from pathlib import Path
 
 import arrow
 import attr
 from arrow import Arrow
+from dateutil import tz
+
+from .api import Team
 
 
 def _ser_filter_attrs(attr, val):
@@ -17,11 +24,16 @@ def _get_class_path(o):
     return "{}.{}".format(o.__module__, o.__class__.__qualname__)
 
 
+def _class_path(klass):
+    return "{}.{}".format(klass.__module__, klass.__qualname__)
+
+
 def _parse_class_path(path: str):
     last_dot = path.rfind(".")
     return path[:last_dot], path[last_dot:][1:]
 
 
+@lru_cache(maxsize=None)
 def _load_class(path):
     mod, klass = _parse_class_path(path)
     m = importlib.import_module(mod)
@@ -29,11 +41,22 @@ def _load_class(path):
 
 
 class _DtoJsonEncoder(JSONEncoder):
+    def __init__(self, refs=False, **kwargs):
+        super().__init__(**kwargs)
+        self.refs = refs
+        self.teams = {}  # team id -> team, the teams written as references
+
+    def _object(self, obj):
+        d = attr.asdict(obj, recurse=False, filter=_ser_filter_attrs)
+        d["__class__"] = _get_class_path(obj)
+        return d
+
     def default(self, obj):
-        if attr.has(obj):
-            d = attr.asdict(obj, recurse=False, filter=_ser_filter_attrs)
-            d["__class__"] = _get_class_path(obj)
-            return d
+        if self.refs and isinstance(obj, Team):
+            self.teams.setdefault(obj.id, obj)
+            return {"__team__": obj.id}
+        elif attr.has(obj):
+            return self._object(obj)
         elif isinstance(obj, Enum):
             return {"__enum__": _get_class_path(obj), "name": obj.name, "value": obj.value}
         elif isinstance(obj, Arrow):
@@ -43,42 +66,370 @@ class _DtoJsonEncoder(JSONEncoder):
 
 
 def dumps(obj, indent=None):
-    return _DtoJsonEncoder(indent=indent).encode(obj)
+    # teams are written once in a table ahead of the data, which refers to them by id
+    encoder = _DtoJsonEncoder(refs=True, indent=indent)
+    data = encoder.encode(obj)
+    if not encoder.teams:
+        return data
+    teams = _DtoJsonEncoder(indent=indent).encode([encoder._object(team) for team in encoder.teams.values()])
+    if indent is None:
+        return '{"__teams__": ' + teams + ', "__data__": ' + data + "}"
+    # nest both documents one level down, JSON strings cannot contain raw newlines
+    pad = "\n" + (" " * indent if isinstance(indent, int) else indent)
+    return (
+        "{"
+        + pad
+        + '"__teams__": '
+        + teams.replace("\n", pad)
+        + ","
+        + pad
+        + '"__data__": '
+        + data.replace("\n", pad)
+        + "\n}"
+    )
 
 
 def dumpf(path, obj, indent=None):
     Path(path).write_text(dumps(obj, indent=indent))
 
 
-def _walk_de(obj):
-    if isinstance(obj, list):
-        return [_walk_de(item) for item in obj]
-    elif isinstance(obj, dict):
-        d = {key: _walk_de(val) for key, val in obj.items()}
+@lru_cache(maxsize=None)
+def _class_decoder(path):
+    # constructor of an attrs class from its JSON dict, resolved once per class path
+    klass = _load_class(path)
+    names = tuple(a.name for a in attr.fields(klass) if a.init)
+    size = len(names) + 1  # fields and the __class__ key
+    if len(names) == 1:
+        name = names[0]
+
+        def getter(d):
+            return (d[name],)
+
+    else:
+        getter = itemgetter(*names)
+
+    def decode(d):
+        if len(d) == size:
+            try:
+                return klass(*getter(d))
+            except KeyError:
+                pass
+        # fields missing from older snapshots keep their defaults
+        kwargs = dict(d)
+        del kwargs["__class__"]
+        return klass(**kwargs)
+
+    return decode
+
+
+def _object_hook(teams):
+    # teams are decoded before the data referring to them, each id maps to a single instance
+    team_path = _class_path(Team)
+    # Arrow objects are immutable, games starting at the same time share one, for the length of a single loads
+    arrows = {}
+
+    def hook(d):
+        team_id = d.get("__team__")
+        if team_id is not None and len(d) == 1:
+            return teams[team_id]
         klass_path = d.get("__class__")
         if klass_path is not None:
-            klass = _load_class(klass_path)
-            del d["__class__"]
-            return klass(**d)
+            obj = _class_decoder(klass_path)(d)
+            if klass_path == team_path:
+                # snapshots written without a team table embed a copy of the team in every object
+                shared = teams.setdefault(obj.id, obj)
+                if shared is not obj and attr.astuple(shared) == attr.astuple(obj):
+                    return shared
+            return obj
         enum_path = d.get("__enum__")
         if enum_path is not None:
-            enum = _load_class(enum_path)
-            return enum(d.get("value"))
-        special = d.get("__special__")
-        if special == "Arrow":
-            return arrow.get(d.get("iso"))
+            return _load_class(enum_path)(d.get("value"))
+        if d.get("__special__") == "Arrow":
+            iso = d.get("iso")
+            value = arrows.get(iso)
+            if value is None:
+                value = arrows[iso] = arrow.get(iso)
+            return value
+        if "__data__" in d and "__teams__" in d and len(d) == 2:
+            return d["__data__"]
         return d
-    else:
-        return obj
+
+    return hook
 
 
 def loads(text):
-    d = json.loads(text)
-    return _walk_de(d)
+    return json.loads(text, object_hook=_object_hook({}))
 
 
 def loadf(path):
     return loads(Path(path).read_text())
 
 
-__all__ = ["loads", "loadf", "dumps", "dumpf"]
+# Binary snapshots
+#
+# layout: magic, version, class registry, string table, team table, root value
+#
+# The class registry gives every attrs class and enum an index along with the names of its fields, so objects only store
+# a class index followed by their field values. Strings are stored once in the string table and teams once in the team
+# table, values refer to them by index. Integers are varints.
+
+_MAGIC = b"TKBS"
+_VERSION = 1
+
+_NONE = 0
+_TRUE = 1
+_FALSE = 2
+_INT = 3
+_FLOAT = 4
+_STR = 5
+_LIST = 6
+_DICT = 7
+_OBJECT = 8
+_TEAM = 9
+_ARROW = 10
+_ENUM = 11
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_DOUBLE = struct.Struct("<d")
+
+
+def _write_uint(out, n):
+    while n >= 0x80:
+        out.append((n & 0x7F) | 0x80)
+        n >>= 7
+    out.append(n)
+
+
+def _write_int(out, n):
+    # zigzag encoding keeps small negative numbers small
+    _write_uint(out, n << 1 if n >= 0 else ((-n) << 1) - 1)
+
+
+def _write_text(out, text):
+    encoded = text.encode("utf-8")
+    _write_uint(out, len(encoded))
+    out += encoded
+
+
+def _init_names(klass):
+    if issubclass(klass, Enum):
+        return ()
+    return tuple(a.name for a in attr.fields(klass) if a.init)
+
+
+class _BinaryWriter:
+    def __init__(self):
+        self.classes = {}  # class -> (index, field names)
+        self.strings = {}  # string -> index
+        self.teams = {}  # team id -> index
+        self.team_list = []
+
+    def _class(self, klass):
+        entry = self.classes.get(klass)
+        if entry is None:
+            entry = self.classes[klass] = (len(self.classes), _init_names(klass))
+        return entry
+
+    def _object(self, out, obj):
+        idx, names = self._class(type(obj))
+        _write_uint(out, idx)
+        for name in names:
+            self._value(out, getattr(obj, name))
+
+    def _value(self, out, obj):
+        if obj is None:
+            out.append(_NONE)
+        elif obj is True:
+            out.append(_TRUE)
+        elif obj is False:
+            out.append(_FALSE)
+        elif isinstance(obj, Enum):
+            out.append(_ENUM)
+            _write_uint(out, self._class(type(obj))[0])
+            self._value(out, obj.value)
+        elif isinstance(obj, int):
+            out.append(_INT)
+            _write_int(out, obj)
+        elif isinstance(obj, float):
+            out.append(_FLOAT)
+            out += _DOUBLE.pack(obj)
+        elif isinstance(obj, str):
+            idx = self.strings.get(obj)
+            if idx is None:
+                idx = self.strings[obj] = len(self.strings)
+            out.append(_STR)
+            _write_uint(out, idx)
+        elif isinstance(obj, (list, tuple)):
+            out.append(_LIST)
+            _write_uint(out, len(obj))
+            for item in obj:
+                self._value(out, item)
+        elif isinstance(obj, dict):
+            out.append(_DICT)
+            _write_uint(out, len(obj))
+            for key, val in obj.items():
+                self._value(out, key)
+                self._value(out, val)
+        elif isinstance(obj, Team):
+            idx = self.teams.get(obj.id)
+            if idx is None:
+                idx = self.teams[obj.id] = len(self.team_list)
+                self.team_list.append(obj)
+            out.append(_TEAM)
+            _write_uint(out, idx)
+        elif isinstance(obj, Arrow):
+            delta = obj.datetime - _EPOCH
+            offset = obj.utcoffset()
+            out.append(_ARROW)
+            _write_int(out, (delta.days * 86400 + delta.seconds) * 1000000 + delta.microseconds)
+            _write_int(out, int(offset.total_seconds()) if offset is not None else 0)
+        elif attr.has(type(obj)):
+            out.append(_OBJECT)
+            self._object(out, obj)
+        else:
+            raise TypeError("cannot serialize object of type {}".format(type(obj).__name__))
+
+    def write(self, root):
+        body = bytearray()
+        self._value(body, root)
+        teams = bytearray()
+        for team in self.team_list:
+            self._object(teams, team)
+
+        out = bytearray(_MAGIC)
+        out.append(_VERSION)
+        _write_uint(out, len(self.classes))
+        for klass, (_, names) in sorted(self.classes.items(), key=lambda item: item[1][0]):
+            _write_text(out, _class_path(klass))
+            _write_uint(out, len(names))
+            for name in names:
+                _write_text(out, name)
+        _write_uint(out, len(self.strings))
+        for text in self.strings:
+            _write_text(out, text)
+        _write_uint(out, len(self.team_list))
+        out += teams
+        out += body
+        return bytes(out)
+
+
+class _BinaryReader:
+    def __init__(self, data):
+        self.data = data
+        self.pos = 0
+        self.classes = []  # (class, field names, positional)
+        self.strings = []
+        self.teams = []
+        self.timezones = {}
+
+    def _uint(self):
+        data = self.data
+        pos = self.pos
+        b = data[pos]
+        pos += 1
+        result = b & 0x7F
+        shift = 7
+        while b & 0x80:
+            b = data[pos]
+            pos += 1
+            result |= (b & 0x7F) << shift
+            shift += 7
+        self.pos = pos
+        return result
+
+    def _int(self):
+        n = self._uint()
+        return n >> 1 if not n & 1 else -((n + 1) >> 1)
+
+    def _text(self):
+        size = self._uint()
+        start = self.pos
+        self.pos += size
+        return bytes(self.data[start : self.pos]).decode("utf-8")
+
+    def _timezone(self, offset):
+        timezone = self.timezones.get(offset)
+        if timezone is None:
+            timezone = self.timezones[offset] = tz.tzutc() if offset == 0 else tz.tzoffset(None, offset)
+        return timezone
+
+    def _object(self):
+        klass, names, positional = self.classes[self._uint()]
+        values = [self._value() for _ in names]
+        if positional:
+            return klass(*values)
+        return klass(**dict(zip(names, values)))
+
+    def _value(self):
+        tag = self.data[self.pos]
+        self.pos += 1
+        if tag == _STR:
+            return self.strings[self._uint()]
+        elif tag == _INT:
+            return self._int()
+        elif tag == _TEAM:
+            return self.teams[self._uint()]
+        elif tag == _OBJECT:
+            return self._object()
+        elif tag == _LIST:
+            return [self._value() for _ in range(self._uint())]
+        elif tag == _NONE:
+            return None
+        elif tag == _TRUE:
+            return True
+        elif tag == _FALSE:
+            return False
+        elif tag == _ARROW:
+            micros = self._int()
+            offset = self._int()
+            dt = (_EPOCH + timedelta(microseconds=micros + offset * 1000000)).replace(tzinfo=self._timezone(offset))
+            return Arrow.fromdatetime(dt)
+        elif tag == _FLOAT:
+            (value,) = _DOUBLE.unpack_from(self.data, self.pos)
+            self.pos += _DOUBLE.size
+            return value
+        elif tag == _DICT:
+            d = {}
+            for _ in range(self._uint()):
+                key = self._value()
+                d[key] = self._value()
+            return d
+        elif tag == _ENUM:
+            klass = self.classes[self._uint()][0]
+            return klass(self._value())
+        raise ValueError("invalid tag {} at offset {}".format(tag, self.pos - 1))
+
+    def read(self):
+        if bytes(self.data[: len(_MAGIC)]) != _MAGIC:
+            raise ValueError("not a binary snapshot")
+        version = self.data[len(_MAGIC)]
+        if version != _VERSION:
+            raise ValueError("unsupported snapshot version {}".format(version))
+        self.pos = len(_MAGIC) + 1
+        for _ in range(self._uint()):
+            klass = _load_class(self._text())
+            names = tuple(self._text() for _ in range(self._uint()))
+            self.classes.append((klass, names, _init_names(klass) == names))
+        self.strings = [self._text() for _ in range(self._uint())]
+        for _ in range(self._uint()):
+            self.teams.append(self._object())
+        return self._value()
+
+
+def dumpb(obj):
+    return _BinaryWriter().write(obj)
+
+
+def dumpbf(path, obj):
+    Path(path).write_bytes(dumpb(obj))
+
+
+def loadb(data):
+    return _BinaryReader(data).read()
+
+
+def loadbf(path):
+    return loadb(Path(path).read_bytes())
+
+
+__all__ = ["loads", "loadf", "dumps", "dumpf", "loadb", "loadbf", "dumpb", "dumpbf"]
@@ -0,0 +1,98 @@
+from collections import deque
+
+from . import api
+from .util import as_date
+
+
+class _Record:
+    __slots__ = ("wins", "losses", "ot", "row", "last10")
+
+    def __init__(self):
+        self.wins = 0
+        self.losses = 0
+        self.ot = 0
+        self.row = 0
+        self.last10 = deque(maxlen=10)
+
+    @property
+    def games_played(self):
+        return self.wins + self.losses + self.ot
+
+    @property
+    def points(self):
+        return self.wins * 2 + self.ot
+
+    def format_last10(self):
+        return api._format_record(self.last10.count("W"), self.last10.count("L"), self.last10.count("O"))
+
+
+# Running standings of the league, fed one result at a time.
+class Table:
+    def __init__(self, teams):
+        self._records = {team: _Record() for team in teams}
+
+    def add(self, result):
+        winner = result.winner
+        loser = result.away if winner == result.home else result.home
+        rec = self._records[winner]
+        rec.wins += 1
+        if not result.shootout:
+            rec.row += 1
+        rec.last10.append("W")
+        rec = self._records[loser]
+        if result.overtime:
+            rec.ot += 1
+            rec.last10.append("O")
+        else:
+            rec.losses += 1
+            rec.last10.append("L")
+
+    def standings(self):
+        # same order as the league standings: points, fewer games played, ROW, wins
+        rows = sorted(
+            self._records.items(),
+            key=lambda item: (-item[1].points, item[1].games_played, -item[1].row, -item[1].wins, item[0].id),
+        )
+        standings = []
+        for place, (team, rec) in enumerate(rows, 1):
+            standings.append(
+                api.Standing(
+                    team=team,
+                    place=place,
+                    gamesPlayed=rec.games_played,
+                    points=rec.points,
+                    wins=rec.wins,
+                    losses=rec.losses,
+                    ot=rec.ot,
+                    row=rec.row,
+                    last10=rec.format_last10(),
+                )
+            )
+        # lottery odds are left to the caller, they depend on the rules of the season
+        return standings
+
+
+def compute_standings(teams, results, date=None):
+    # standings on the morning of the given date, from every result before that date
+    date = as_date(date)
+    table = Table(teams)
+    for result in sorted(results, key=lambda r: r.time):
+        if date is None or result.time.date() < date:
+            table.add(result)
+    return table.standings()
+
+
+def daily_standings(teams, results):
+    # yields (date, standings after the games of that date) for every date with results, in order
+    table = Table(teams)
+    day = None
+    for result in sorted(results, key=lambda r: r.time):
+        if day is not None and result.time.date() != day:
+            yield day, table.standings()
+        day = result.time.date()
+        table.add(result)
+    if day is not None:
+        yield day, table.standings()
+
+
+__all__ = ["Table", "compute_standings", "daily_standings"]
@@ -0,0 +1,230 @@
+import sqlite3
+
+import arrow
+
+from . import lottery
+from .api import Game, Info, Result, Standing, Team, assign_lottery_odds
+from .util import as_date
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS teams (
+    id INTEGER PRIMARY KEY,
+    code TEXT NOT NULL,
+    fullname TEXT NOT NULL,
+    name TEXT NOT NULL,
+    location TEXT NOT NULL,
+    division TEXT NOT NULL,
+    conference TEXT NOT NULL,
+    subreddit TEXT
+);
+CREATE TABLE IF NOT EXISTS standings (
+    date TEXT NOT NULL,
+    team_id INTEGER NOT NULL REFERENCES teams (id),
+    place INTEGER NOT NULL,
+    games_played INTEGER NOT NULL,
+    points INTEGER NOT NULL,
+    wins INTEGER NOT NULL,
+    losses INTEGER NOT NULL,
+    ot INTEGER NOT NULL,
+    row INTEGER NOT NULL,
+    last10 TEXT,
+    PRIMARY KEY (date, team_id)
+);
+CREATE INDEX IF NOT EXISTS standings_team ON standings (team_id, date);
+CREATE TABLE IF NOT EXISTS games (
+    date TEXT NOT NULL,
+    home_id INTEGER NOT NULL REFERENCES teams (id),
+    away_id INTEGER NOT NULL REFERENCES teams (id),
+    time TEXT NOT NULL,
+    PRIMARY KEY (date, home_id, away_id)
+);
+CREATE TABLE IF NOT EXISTS results (
+    date TEXT NOT NULL,
+    home_id INTEGER NOT NULL REFERENCES teams (id),
+    away_id INTEGER NOT NULL REFERENCES teams (id),
+    time TEXT NOT NULL,
+    home_score INTEGER NOT NULL,
+    away_score INTEGER NOT NULL,
+    overtime INTEGER NOT NULL,
+    shootout INTEGER NOT NULL,
+    PRIMARY KEY (date, home_id, away_id)
+);
+CREATE INDEX IF NOT EXISTS results_home ON results (home_id, away_id, date);
+CREATE INDEX IF NOT EXISTS results_away ON results (away_id, home_id, date);
+"""
+
+_TEAM_FIELDS = "id, code, fullname, name, location, division, conference, subreddit"
+_STANDING_FIELDS = "team_id, place, games_played, points, wins, losses, ot, row, last10"
+
+
+def _day(date):
+    return as_date(date).isoformat()
+
+
+# Teams, daily standings, games and results of any number of days in a SQLite database.
+#
+# Games are stored under the day they are scheduled and results under the day they were played, the same days as the
+# games and results lists of an Info. Every save is a single transaction.
+class Store:
+    def __init__(self, path=":memory:"):
+        self.conn = sqlite3.connect(str(path))
+        if path != ":memory:":
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(_SCHEMA)
+        self._teams = None  # id -> team, loaded on first use
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.conn.close()
+
+    # writes
+
+    def save(self, info: Info):
+        with self.conn:
+            self._save_teams(info.teams)
+            self._save_standings(info.date, info.standings)
+            # the past standings only fill a missing day, the table saved on the day itself is the one to trust: they
+            # are downloaded again without the ledger and may be today's table
+            if info.past_standings:
+                self._save_standings(info.past_date, info.past_standings, replace=False)
+            self._save_games(info.date, info.games)
+            self._save_results(info.past_date, info.results)
+
+    def save_results(self, date, results):
+        with self.conn:
+            self._save_results(date, results)
+
+    def _save_teams(self, teams):
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO teams ({}) VALUES (?, ?, ?, ?, ?, ?, ?, ?)".format(_TEAM_FIELDS),
+            [(t.id, t.code, t.fullname, t.name, t.location, t.division, t.conference, t.subreddit) for t in teams],
+        )
+        self._teams = None
+
+    def _save_standings(self, date, standings, replace=True):
+        day = _day(date)
+        if not replace:
+            if self.conn.execute("SELECT 1 FROM standings WHERE date = ? LIMIT 1", (day,)).fetchone() is not None:
+                return
+        self.conn.execute("DELETE FROM standings WHERE date = ?", (day,))
+        self.conn.executemany(
+            "INSERT INTO standings (date, {}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)".format(_STANDING_FIELDS),
+            [
+                (day, s.team.id, s.place, s.gamesPlayed, s.points, s.wins, s.losses, s.ot, s.row, s.last10)
+                for s in standings
+            ],
+        )
+
+    def _save_games(self, date, games):
+        day = _day(date)
+        self.conn.execute("DELETE FROM games WHERE date = ?", (day,))
+        self.conn.executemany(
+            "INSERT INTO games (date, home_id, away_id, time) VALUES (?, ?, ?, ?)",
+            [(day, g.home.id, g.away.id, g.time.isoformat()) for g in games],
+        )
+
+    def _save_results(self, date, results):
+        day = _day(date)
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO results (date, home_id, away_id, time, home_score, away_score, overtime, shootout)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            [
+                (day, r.home.id, r.away.id, r.time.isoformat(), r.home_score, r.away_score, r.overtime, r.shootout)
+                for r in results
+            ],
+        )
+
+    # reads
+
+    @property
+    def teams(self):
+        if self._teams is None:
+            rows = self.conn.execute("SELECT {} FROM teams ORDER BY id".format(_TEAM_FIELDS))
+            self._teams = {row[0]: Team(*row) for row in rows}
+        return self._teams
+
+    def dates(self):
+        return [
+            arrow.get(row[0]).date() for row in self.conn.execute("SELECT DISTINCT date FROM standings ORDER BY date")
+        ]
+
+    def standings(self, date):
+        teams = self.teams
+        rows = self.conn.execute(
+            "SELECT {} FROM standings WHERE date = ? ORDER BY place".format(_STANDING_FIELDS), (_day(date),)
+        )
+        return [Standing(teams[row[0]], *row[1:]) for row in rows]
+
+    def games(self, date):
+        teams = self.teams
+        rows = self.conn.execute(
+            "SELECT time, home_id, away_id FROM games WHERE date = ? ORDER BY time, home_id", (_day(date),)
+        )
+        return [Game(arrow.get(time), teams[home], teams[away]) for time, home, away in rows]
+
+    def _results(self, where, params):
+        teams = self.teams
+        rows = self.conn.execute(
+            "SELECT time, home_id, away_id, home_score, away_score, overtime, shootout FROM results"
+            " WHERE {} ORDER BY time, home_id".format(where),
+            params,
+        )
+        return [
+            Result(arrow.get(time), teams[home], teams[away], home_score, away_score, bool(overtime), bool(shootout))
+            for time, home, away, home_score, away_score, overtime, shootout in rows
+        ]
+
+    def results(self, date):
+        return self._results("date = ?", (_day(date),))
+
+    def info(self, date):
+        # the Info of a day as fetch_info would have returned it, None when the day's standings are not stored
+        date = arrow.get(date)
+        standings = self.standings(date)
+        if not standings:
+            return None
+        past_date = date.shift(days=-1)
+        info = Info(
+            list(self.teams.values()),
+            date,
+            standings=standings,
+            past_standings=self.standings(past_date),
+            games=self.games(date),
+            results=self.results(past_date),
+        )
+        rules = lottery.rules_for(info.date)
+        assign_lottery_odds(info.standings, rules)
+        assign_lottery_odds(info.past_standings, rules)
+        return info
+
+    def points_trajectory(self, team, start=None, end=None):
+        # (date, games played, points) of a team, one entry per stored day
+        rows = self.conn.execute(
+            "SELECT date, games_played, points FROM standings WHERE team_id = ? AND date >= ? AND date <= ?"
+            " ORDER BY date",
+            (team.id, _day(start) if start is not None else "", _day(end) if end is not None else "9999"),
+        )
+        return [(arrow.get(day).date(), games_played, points) for day, games_played, points in rows]
+
+    def results_between(self, a, b, start=None, end=None):
+        # every result of games between two teams, whichever one was home
+        return self._results(
+            "((home_id = ? AND away_id = ?) OR (home_id = ? AND away_id = ?)) AND date >= ? AND date <= ?",
+            (
+                a.id,
+                b.id,
+                b.id,
+                a.id,
+                _day(start) if start is not None else "",
+                _day(end) if end is not None else "9999",
+            ),
+        )
+
+
+__all__ = ["Store"]
@@ -0,0 +1,186 @@
+import json
+import os
+import queue
+import re
+import sys
+import threading
+import time
+import uuid
+from pathlib import Path
+
+from attr import attrib, attrs
+
+_RATELIMIT_RE = re.compile(r"(\d+) (minute|second)")
+
+
+@attrs(slots=True)
+class Submitted:
+    kind = attrib()
+    code = attrib()
+    title = attrib()
+    submission_id = attrib(default=None)
+    wait = attrib(default=0.0)  # seconds spent in the queue
+    latency = attrib(default=0.0)  # seconds from the first attempt until the post went through or gave up
+    attempts = attrib(default=0)
+    error = attrib(default=None)
+    edited = attrib(default=False)  # an existing submission was edited instead of a new one created
+
+
+def _ratelimit_delay(error):
+    # reddit answers "RATELIMIT: you are doing that too much. try again in 9 minutes." when posting too fast
+    text = str(error)
+    if "RATELIMIT" not in text.upper() and "doing that too much" not in text:
+        return None
+    match = _RATELIMIT_RE.search(text)
+    if match is None:
+        return None
+    amount, unit = int(match.group(1)), match.group(2)
+    return amount * 60 if unit == "minute" else amount
+
+
+# Submits posts to reddit from a background thread, so rendering keeps going while posts are sent.
+#
+# Every post is written to the outbox directory before it is queued and removed once reddit accepted it, posts that
+# still fail after all the retries stay there and are sent again by resend() as long as they are for the same day.
+class SubmissionQueue:
+    def __init__(
+        self, reddit, outbox="outbox", date=None, retries=4, backoff=5.0, sleep=time.sleep, clock=time.monotonic
+    ):
+        self.reddit = reddit
+        self.outbox = Path(outbox)
+        self.date = date.format("YYYY-MM-DD") if date is not None else None  # day of the posts
+        self.retries = retries
+        self.backoff = backoff
+        self.sleep = sleep
+        self.clock = clock
+        self.submitted = []
+        self.queued = set()  # (kind, code, title) of every post queued by this run, sent or not
+        self.dropped = []  # entries of earlier days removed from the outbox by resend()
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="submission-queue", daemon=True)
+        self.outbox.mkdir(parents=True, exist_ok=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def put(self, post, submission_id=None):
+        # with a submission id, the text of that submission is replaced instead of creating a new one
+        entry = {
+            "kind": post.kind,
+            "code": post.team.code,
+            "subreddit": post.team.subreddit,
+            "title": post.title,
+            "text": post.text,
+            "submission_id": submission_id,
+            "date": self.date,
+        }
+        path = self.outbox / "{}-{}-{}.json".format(post.kind, post.team.code.lower(), uuid.uuid4().hex[:8])
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(entry))
+        os.replace(str(tmp), str(path))
+        self._enqueue(path, entry)
+
+    def resend(self):
+        # queue the posts of the day left in the outbox by a previous run
+        #
+        # A post of an earlier day is dropped, its title names a day that is over and it would go up as a new thread
+        # nobody follows. Posts of a later day, left by a run for the next day before a replay, are kept for it.
+        count = 0
+        for path in sorted(self.outbox.glob("*.json")):
+            try:
+                entry = json.loads(path.read_text())
+            except (OSError, ValueError):
+                continue
+            day = entry.get("date")
+            if self.date is not None and (day is None or day < self.date):
+                print("Dropping", entry["code"], entry["kind"], "post of", day or "an unknown day", file=sys.stderr)
+                self.dropped.append(entry)
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+                continue
+            if self.date is not None and day != self.date:
+                continue
+            self._enqueue(path, entry)
+            count += 1
+        return count
+
+    def _enqueue(self, path, entry):
+        self.queued.add((entry["kind"], entry["code"].lower(), entry["title"]))
+        self._queue.put((path, entry, self.clock()))
+
+    def close(self):
+        # waits until every queued post was sent or gave up
+        self._queue.put(None)
+        self._thread.join()
+        return self.submitted
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            self.submitted.append(self._submit(*item))
+
+    def _wait_for_ratelimit(self):
+        limits = getattr(getattr(self.reddit, "auth", None), "limits", None) or {}
+        remaining = limits.get("remaining")
+        reset = limits.get("reset_timestamp")
+        if remaining is not None and remaining < 1 and reset is not None:
+            self.sleep(max(0, reset - time.time()))
+
+    def _submit(self, path, entry, queued):
+        result = Submitted(entry["kind"], entry["code"], entry["title"])
+        edit_id = entry.get("submission_id")
+        result.edited = edit_id is not None
+        start = self.clock()
+        result.wait = start - queued
+        for attempt in range(self.retries + 1):
+            self._wait_for_ratelimit()
+            result.attempts += 1
+            try:
+                if edit_id is not None:
+                    submission = self.reddit.submission(id=edit_id)
+                    submission.edit(entry["text"])
+                else:
+                    sub = self.reddit.subreddit(entry["subreddit"])
+                    submission = sub.submit(entry["title"], selftext=entry["text"], send_replies=False)
+            except Exception as e:
+                result.error = str(e)
+                if attempt == self.retries:
+                    print("Error sending", entry["code"], e, file=sys.stderr)
+                    break
+                delay = _ratelimit_delay(e)
+                self.sleep(delay if delay is not None else self.backoff * 2**attempt)
+            else:
+                result.submission_id = edit_id if edit_id is not None else getattr(submission, "id", None)
+                result.error = None
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+                break
+        result.latency = self.clock() - start
+        return result
+
+
+def format_report(submitted):
+    lines = []
+    for s in submitted:
+        if s.error is not None:
+            status = "failed: {}".format(s.error)
+        elif s.edited:
+            status = "edited {}".format(s.submission_id)
+        else:
+            status = s.submission_id
+        lines.append(
+            "{} {:<8} waited {:>8.1f} ms  sent in {:>8.1f} ms  {} attempt(s)  {}".format(
+                s.code, s.kind, s.wait * 1000, s.latency * 1000, s.attempts, status
+            )
+        )
+    return "\n".join(lines)
+
+
+__all__ = ["SubmissionQueue", "Submitted", "format_report"]
@@ -0,0 +1,133 @@
+import random
+import string
+
+import arrow
+from attr import attrib, attrs
+from dateutil import tz
+
+from . import lottery
+from .api import Game, Info, Result, Team, assign_lottery_odds
+from .standings import compute_standings
+
+SEASON_START = arrow.Arrow(2018, 10, 3, tzinfo=tz.tzoffset(None, -5 * 3600))
+GAME_HOURS = (19, 19, 19, 20, 21, 22)  # start times, most games start at 7
+MIN_TEAMS_PER_DIVISION = 4  # the playoffs analysis needs a top 3 in every division and a wild card race
+
+
+def _code(index):
+    # AAA, AAB, ... ZZZ, then AAAA, ... when a league outgrows three letters
+    width = 3
+    while index >= 26**width:
+        index -= 26**width
+        width += 1
+    letters = []
+    for _ in range(width):
+        letters.append(string.ascii_uppercase[index % 26])
+        index //= 26
+    return "".join(reversed(letters))
+
+
+def make_teams(count, conferences=2, divisions=2):
+    # `divisions` per conference, teams are dealt to divisions in turn
+    slots = conferences * divisions
+    if count < slots * MIN_TEAMS_PER_DIVISION:
+        raise ValueError("at least {} teams are needed".format(slots * MIN_TEAMS_PER_DIVISION))
+    teams = []
+    for i in range(count):
+        slot = i % slots
+        code = _code(i)
+        teams.append(
+            Team(
+                id=i + 1,
+                code=code,
+                fullname="Synthetic {}".format(code),
+                name=code.title(),
+                location="Synthetic",
+                division="Division {}".format(slot + 1),
+                conference="Conference {}".format(slot // divisions + 1),
+                subreddit="synthetic{}".format(code.lower()),
+            )
+        )
+    return teams
+
+
+def make_schedule(teams, games_per_team=82, rng=None, start=SEASON_START):
+    # every team plays once per round, each round's pairs are spread over two days
+    rng = rng if rng is not None else random.Random(0)
+    times = {}  # (day, hour) -> start time, shared by the games starting together
+    games = []
+    for r in range(games_per_team):
+        order = list(teams)
+        rng.shuffle(order)
+        pairs = [(order[i], order[i + 1]) for i in range(0, len(order) - 1, 2)]
+        half = (len(pairs) + 1) // 2
+        for n, (a, b) in enumerate(pairs):
+            slot = (r * 2 + (n >= half), rng.choice(GAME_HOURS))
+            time = times.get(slot)
+            if time is None:
+                time = times[slot] = start.shift(days=slot[0]).replace(hour=slot[1], minute=0, second=0, microsecond=0)
+            home, away = (a, b) if rng.random() < 0.5 else (b, a)
+            games.append(Game(time, home, away))
+    games.sort(key=lambda g: (g.time, g.home.id))
+    return games
+
+
+def play(game, rng):
+    # a plausible final score, about a quarter of the games go past regulation
+    home_score = rng.choice((0, 1, 2, 2, 3, 3, 3, 4, 4, 5, 6))
+    away_score = rng.choice((0, 1, 1, 2, 2, 3, 3, 4, 4, 5))
+    overtime = shootout = False
+    if home_score == away_score:
+        overtime = True
+        shootout = rng.random() < 0.4
+        if rng.random() < 0.55:
+            home_score += 1
+        else:
+            away_score += 1
+    return Result(game.time, game.home, game.away, home_score, away_score, overtime, shootout)
+
+
+@attrs(slots=True)
+class League:
+    teams = attrib()
+    schedule = attrib()  # every game of the season
+    results = attrib()  # results of the games played before `date`
+    date = attrib()
+
+    def info(self):
+        # the Info of the league's date, as fetch_info would build it
+        date = self.date
+        past_date = date.shift(days=-1)
+        info = Info(
+            self.teams,
+            date,
+            standings=compute_standings(self.teams, self.results, date),
+            past_standings=compute_standings(self.teams, self.results, past_date),
+            games=[g for g in self.schedule if g.time.date() == date.date()],
+            results=[r for r in self.results if r.time.date() == past_date.date()],
+        )
+        rules = lottery.rules_for(date)
+        assign_lottery_odds(info.standings, rules)
+        assign_lottery_odds(info.past_standings, rules)
+        return info
+
+
+def make_league(teams=31, games_per_team=82, progress=0.5, seed=0, conferences=2, divisions=2):
+    # a league `progress` of the way through its season, the same seed always gives the same league
+    rng = random.Random(seed)
+    team_list = make_teams(teams, conferences, divisions)
+    schedule = make_schedule(team_list, games_per_team, rng)
+    first = schedule[0].time.floor("day")
+    last = schedule[-1].time.floor("day")
+    days = (last - first).days
+    date = first.shift(days=int(round(days * progress))).replace(hour=8)
+    cutoff = date.floor("day")
+    results = [play(g, rng) for g in schedule if g.time < cutoff]
+    return League(team_list, schedule, results, date)
+
+
+def make_info(teams=31, games_per_team=82, progress=0.5, seed=0, conferences=2, divisions=2):
+    return make_league(teams, games_per_team, progress, seed, conferences, divisions).info()
+
+
+__all__ = ["make_teams", "make_schedule", "play", "League", "make_league", "make_info"]
@@ -0,0 +1,92 @@
+import os
+import random
+import time
+
+from tankbot import serde
+from tankbot.api import _bag, fetch_info
+
+INFO2 = serde.loadf(os.path.join(os.path.dirname(__file__), "info2.json"))
+
+
+def game(g, final):
+    entry = {
+        "gamePk": hash((g.time.isoformat(), g.home.id)),
+        "gameDate": g.time.to("utc").isoformat(),
+        "status": {"abstractGameState": "Final" if final else "Preview"},
+        "teams": {"home": {"team": {"id": g.home.id}}, "away": {"team": {"id": g.away.id}}},
+    }
+    if final:
+        entry["teams"]["home"]["score"] = g.home_score
+        entry["teams"]["away"]["score"] = g.away_score
+        entry["linescore"] = {"periods": [{}] * (4 if g.overtime else 3), "hasShootout": g.shootout}
+    return entry
+
+
+# Answers from a saved info, each call after a random delay so that parallel calls finish in any order.
+class InfoAPI:
+    def __init__(self, info):
+        self.info = info
+
+    def _wait(self):
+        time.sleep(random.random() / 100)
+
+    def teams(self):
+        self._wait()
+        teams = [
+            {
+                "id": t.id,
+                "abbreviation": t.code,
+                "name": t.fullname,
+                "locationName": t.location,
+                "teamName": t.name,
+                "division": {"name": t.division},
+                "conference": {"name": t.conference},
+            }
+            for t in self.info.teams
+        ]
+        return _bag({"teams": teams})
+
+    def standings(self, **params):
+        self._wait()
+        records = []
+        for s in self.info.standings:
+            wins, losses, ot = (int(n) for n in s.last10.split("-"))
+            records.append(
+                {
+                    "team": {"id": s.team.id},
+                    "gamesPlayed": s.gamesPlayed,
+                    "points": s.points,
+                    "leagueRecord": {"wins": s.wins, "losses": s.losses, "ot": s.ot},
+                    "row": s.row,
+                    "records": {"overallRecords": [{"type": "lastTen", "wins": wins, "losses": losses, "ot": ot}]},
+                }
+            )
+        return _bag({"records": [{"teamRecords": records}]})
+
+    def schedule(self, start_date, end_date, expand=None):
+        self._wait()
+        days = {}
+        for r in self.info.results:
+            days.setdefault(r.time.date().isoformat(), []).append(game(r, True))
+        for g in self.info.games:
+            days.setdefault(g.time.date().isoformat(), []).append(game(g, False))
+        dates = [{"date": d, "games": games} for d, games in sorted(days.items()) if start_date <= d <= end_date]
+        return _bag({"dates": dates})
+
+
+def test_parallel_fetch_is_serial_fetch():
+    client = InfoAPI(INFO2)
+    serial = fetch_info(INFO2.date, parallel=False, client=client)
+    assert len(serial.games) == len(INFO2.games) and len(serial.results) == len(INFO2.results)
+    assert len(serial.standings) == len(INFO2.standings)
+    for _ in range(3):
+        parallel = fetch_info(INFO2.date, parallel=True, client=client)
+        assert serde.dumps(parallel) == serde.dumps(serial)
+
+
+def test_parallel_fetch_from_results():
+    client = InfoAPI(INFO2)
+    results = list(INFO2.results)
+    serial = fetch_info(INFO2.date, parallel=False, client=client, results=results)
+    parallel = fetch_info(INFO2.date, parallel=True, client=client, results=results)
+    assert serde.dumps(parallel) == serde.dumps(serial)
@@ -0,0 +1,88 @@
+import fcntl
+import os
+import threading
+
+import pytest
+from tankbot import serde
+from tankbot.archive import _FRAME, Archive
+
+INFOS = [serde.loadf(os.path.join(os.path.dirname(__file__), "info{}.json".format(n))) for n in range(3)]
+
+
+def test_append_and_load(tmp_path):
+    path = tmp_path / "season.tka"
+    with Archive(path) as archive:
+        for info in INFOS:
+            archive.append(info)
+        assert len(archive) == len({info.date.date() for info in INFOS})
+        info = INFOS[1]
+        loaded = archive.load(info.date)
+        assert [s.team.id for s in loaded.standings] == [s.team.id for s in info.standings]
+        assert loaded.date == info.date
+
+    # appending only adds a frame
+    size = path.stat().st_size
+    with Archive(path) as archive:
+        archive.append(INFOS[0], date=INFOS[0].date.shift(days=100))
+    assert path.stat().st_size > size
+    assert Archive(path).dates()[-1] == INFOS[0].date.shift(days=100).date()
+
+
+def test_days_range(tmp_path):
+    archive = Archive(tmp_path / "season.tka")
+    base = INFOS[0].date
+    for n in range(5):
+        archive.append(INFOS[n % 3], date=base.shift(days=n))
+    days = list(archive.days(base.shift(days=1), base.shift(days=3)))
+    assert [d for d, _ in days] == [base.shift(days=n).date() for n in range(1, 4)]
+    assert len(days[0][1].standings) == len(INFOS[1].standings)
+    archive.close()
+
+
+def test_truncated_frame_is_replaced(tmp_path):
+    path = tmp_path / "season.tka"
+    archive = Archive(path)
+    archive.append(INFOS[0])
+    good = path.stat().st_size
+    archive.append(INFOS[1], date=INFOS[0].date.shift(days=1))
+    archive.close()
+    with path.open("r+b") as f:
+        f.truncate(good + 20)
+
+    archive = Archive(path)
+    assert archive.dates() == [INFOS[0].date.date()]
+    archive.append(INFOS[2], date=INFOS[0].date.shift(days=2))
+    assert len(archive) == 2
+    assert len(archive.load(INFOS[0].date.shift(days=2)).games) == len(INFOS[2].games)
+    archive.close()
+
+
+def test_overlapping_appends(tmp_path):
+    # a manual run appending while the daily one holds the file keeps the daily one's frame
+    path = tmp_path / "season.tka"
+    first = Archive(path)
+    first.append(INFOS[0])
+    assert len(first) == 1
+
+    second = Archive(path)
+    with path.open("ab") as f:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        writer = threading.Thread(target=second.append, args=(INFOS[2], INFOS[0].date.shift(days=2)))
+        writer.start()
+        writer.join(0.2)
+        assert writer.is_alive()
+        # the frame the lock holder writes meanwhile
+        data = serde.dumpb(INFOS[1])
+        f.write(_FRAME.pack(INFOS[0].date.shift(days=1).date().isoformat().encode("ascii"), len(data)) + data)
+    writer.join()
+    first.close()
+    second.close()
+
+    assert Archive(path).dates() == [INFOS[0].date.shift(days=n).date() for n in range(3)]
+
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / "other"
+    path.write_bytes(b"something else")
+    with pytest.raises(ValueError):
+        Archive(path).dates()
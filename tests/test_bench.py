@@ -0,0 +1,27 @@
+from tankbot import bench
+
+
+def test_compare():
+    baseline = {
+        "results": [{"case": "a", "fixture": "x", "best_ms": 1.0}, {"case": "b", "fixture": "x", "best_ms": 2.0}]
+    }
+    results = [
+        {"case": "a", "fixture": "x", "best_ms": 1.2},
+        {"case": "b", "fixture": "x", "best_ms": 3.0},
+        {"case": "c", "fixture": "x", "best_ms": 9.0},
+    ]
+    (regression,) = bench.compare(baseline, results, threshold=0.25)
+    assert regression["case"] == "b" and regression["baseline_ms"] == 2.0
+
+
+def test_suite_runs(tmp_path):
+    out = tmp_path / "bench.json"
+    path = str(bench.FIXTURES / "info0.json")
+    assert bench.main([path, "--repeat", "1", "--json", str(out)]) == 0
+    assert bench.main([path, "--repeat", "1", "--compare", str(out), "--threshold", "1000"]) == 0
+
+
+def test_synthetic_cases():
+    results = bench.run_suite([], 1, sizes=[16])
+    assert {r["fixture"] for r in results} >= {"synthetic-16"}
+    assert "standings.compute_standings" in {r["case"] for r in results}
@@ -0,0 +1,141 @@
+from types import SimpleNamespace
+
+import pytest
+import tankbot.cache
+from tankbot.api import CachedNHLAPI
+from tankbot.cache import FileCache, MemoryCache
+
+
+def game(state):
+    return SimpleNamespace(gamePk=1, status=SimpleNamespace(abstractGameState=state))
+
+
+# Answers like nhlapi, with objects rather than dicts, and counts the calls that reach it.
+class CountingAPI:
+    def __init__(self, state="Final", games=1):
+        self.state = state
+        self.games = games
+        self.calls = []
+
+    def teams(self):
+        self.calls.append("teams")
+        return SimpleNamespace(teams=[SimpleNamespace(id=8, abbreviation="MTL")])
+
+    def standings(self, **params):
+        self.calls.append("standings")
+        return SimpleNamespace(records=[])
+
+    def schedule(self, **params):
+        self.calls.append("schedule")
+        games = [game(self.state) for _ in range(self.games)]
+        return SimpleNamespace(dates=[SimpleNamespace(date=params["start_date"], games=games)] if games else [])
+
+    def other(self):
+        self.calls.append("other")
+        return SimpleNamespace()
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000000.0]
+    monkeypatch.setattr(tankbot.cache.time, "time", lambda: now[0])
+    return now
+
+
+@pytest.fixture(params=["memory", "file"])
+def cache(request, tmp_path):
+    return MemoryCache() if request.param == "memory" else FileCache(tmp_path / "cache")
+
+
+def test_hit_round_trip(cache):
+    api = CountingAPI()
+    client = CachedNHLAPI(api, cache)
+    first = client.teams()
+    second = client.teams()
+    assert api.calls == ["teams"]
+    # served from the cache, the response reads like the one from the API
+    assert second.teams[0].abbreviation == first.teams[0].abbreviation == "MTL"
+    assert second.teams[0].id == 8
+
+
+def test_ttl_expiry(cache, clock):
+    api = CountingAPI()
+    client = CachedNHLAPI(api, cache)
+    client.standings(expand="standings.record")
+    clock[0] += 14 * 60
+    client.standings(expand="standings.record")
+    assert api.calls == ["standings"]
+    clock[0] += 2 * 60
+    client.standings(expand="standings.record")
+    assert api.calls == ["standings", "standings"]
+
+    # the parameters are part of the key
+    client.standings(expand="other")
+    assert len(api.calls) == 3
+
+
+def test_final_past_schedule_kept_forever(cache, clock):
+    api = CountingAPI("Final")
+    client = CachedNHLAPI(api, cache)
+    client.schedule(start_date="2019-01-12", end_date="2019-01-12")
+    clock[0] += 365 * 24 * 3600
+    data = client.schedule(start_date="2019-01-12", end_date="2019-01-12")
+    assert api.calls == ["schedule"]
+    assert data.dates[0].games[0].status.abstractGameState == "Final"
+
+
+@pytest.mark.parametrize(
+    "state,games,params",
+    [
+        # a past game that is not final, e.g. postponed, can still change
+        ("Preview", 1, {"start_date": "2019-01-12", "end_date": "2019-01-12"}),
+        # today's and future games as well
+        ("Final", 1, {"start_date": "2999-01-12", "end_date": "2999-01-12"}),
+        ("Final", 1, {"start_date": "2019-01-12"}),
+    ],
+)
+def test_schedule_expires(cache, clock, state, games, params):
+    api = CountingAPI(state, games)
+    client = CachedNHLAPI(api, cache)
+    client.schedule(**params)
+    clock[0] += 6 * 60
+    client.schedule(**params)
+    assert api.calls == ["schedule", "schedule"]
+
+
+def test_empty_past_schedule_kept_forever(cache, clock):
+    # no game on a past day is as final as it gets
+    api = CountingAPI(games=0)
+    client = CachedNHLAPI(api, cache)
+    client.schedule(start_date="2019-01-12", end_date="2019-01-12")
+    clock[0] += 365 * 24 * 3600
+    assert client.schedule(start_date="2019-01-12", end_date="2019-01-12").dates == []
+    assert api.calls == ["schedule"]
+
+
+def test_uncached_endpoint(cache):
+    api = CountingAPI()
+    client = CachedNHLAPI(api, cache)
+    client.other()
+    client.other()
+    assert api.calls == ["other", "other"]
+
+
+def test_file_cache_set_is_atomic(tmp_path, monkeypatch):
+    cache = FileCache(tmp_path)
+    cache.set("key", {"value": 1})
+
+    def fail(src, dst):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(tankbot.cache.os, "replace", fail)
+    with pytest.raises(OSError):
+        cache.set("key", {"value": 2})
+    # the previous entry is left whole and the temporary file is removed
+    assert cache.get("key") == {"value": 1}
+    assert [p.suffix for p in tmp_path.iterdir()] == [".json"]
+
+    # a new instance reads what an earlier run wrote
+    monkeypatch.undo()
+    FileCache(tmp_path).set("key", {"value": 3})
+    assert FileCache(tmp_path).get("key") == {"value": 3}
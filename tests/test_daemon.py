@@ -0,0 +1,55 @@
+import os
+
+from attr import evolve
+from tankbot import daemon, serde
+
+INFO2 = serde.loadf(os.path.join(os.path.dirname(__file__), "info2.json"))
+
+
+class Clock:
+    def __init__(self, now):
+        self.now = now
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now = self.now.shift(seconds=seconds)
+
+
+def test_next_wake():
+    last = max(game.time for game in INFO2.games)
+    assert daemon.next_wake(INFO2) == last.shift(hours=3)
+    quiet = evolve(INFO2, games=[])
+    assert daemon.next_wake(quiet, morning=7) == INFO2.date.shift(days=1).floor("day").replace(hour=7)
+
+
+def test_run_daemon(monkeypatch):
+    clock = Clock(INFO2.date.floor("day").replace(hour=8))
+    polls = []
+
+    def all_final(client, date):
+        polls.append(clock.now)
+        return len(polls) > 2
+
+    monkeypatch.setattr(daemon, "all_final", all_final)
+    dates = []
+    failures = [True]
+
+    def run(date):
+        dates.append(date)
+        if date is not None and failures:
+            failures.pop()
+            raise RuntimeError("api down")
+        return evolve(INFO2, date=date or clock.now)
+
+    daemon.run_daemon(run, None, sleep=clock.sleep, now=clock, runs=2)
+
+    next_day = INFO2.date.shift(days=1).floor("day")
+    assert dates == [None, next_day, next_day]
+    # slept until the last game should be over, then polled until the games were final
+    assert polls[0] == max(game.time for game in INFO2.games).shift(hours=3)
+    assert len(polls) == 3
+    assert clock.sleeps[-1] == daemon.RETRY_INTERVAL
@@ -0,0 +1,86 @@
+import arrow
+from tankbot.analysis import elimination
+from tankbot.analysis.elimination import Elimination
+from tankbot.api import Game, Info, Standing, Team
+
+
+def make_info(records):
+    teams = []
+    standings = []
+    for place, (code, gp, points) in enumerate(records, 1):
+        team = Team(id=place, code=code, fullname=code, name=code, location=code, division="D", conference="C")
+        teams.append(team)
+        standings.append(
+            Standing(
+                team=team,
+                place=place,
+                gamesPlayed=gp,
+                points=points,
+                wins=points // 2,
+                losses=0,
+                ot=0,
+                row=0,
+                last10="",
+            )
+        )
+    return Info(teams, arrow.get("2019-03-01"), standings)
+
+
+def game(info, home, away):
+    return Game(time=info.date, home=info.get_team_by_code(home), away=info.get_team_by_code(away))
+
+
+def test_eliminated_by_schedule():
+    # nobody is out of reach of D on its own, but A, B and C play each other and one of them must pass D
+    info = make_info([("A", 80, 13), ("B", 80, 13), ("C", 80, 13), ("D", 80, 10)])
+    games = [game(info, "A", "B"), game(info, "B", "C"), game(info, "C", "A")]
+    e = Elimination(info, games, division_spots=1, wildcard_spots=0)
+    d = e.get(info.get_team_by_code("D"))
+    assert d.eliminated and d.tragic == 0
+    assert not e.get(info.get_team_by_code("A")).eliminated
+
+
+def test_not_eliminated_without_schedule():
+    # the same teams playing outside opponents can all lose
+    info = make_info([("A", 80, 13), ("B", 80, 13), ("C", 80, 13), ("D", 80, 10)])
+    e = Elimination(info, [], division_spots=1, wildcard_spots=0)
+    d = e.get(info.get_team_by_code("D"))
+    assert not d.eliminated
+    assert d.tragic == 14 - 13 + 1
+
+
+def test_clinched_and_magic():
+    info = make_info([("A", 80, 21), ("B", 80, 15), ("C", 78, 12), ("D", 80, 10)])
+    e = Elimination(info, [], division_spots=1, wildcard_spots=0)
+    a = e.get(info.get_team_by_code("A"))
+    assert a.clinched and a.magic == 0
+    # B can reach 19 points, C 20
+    info = make_info([("A", 80, 18), ("B", 80, 15), ("C", 78, 12), ("D", 80, 10)])
+    e = Elimination(info, [], division_spots=1, wildcard_spots=0)
+    a = e.get(info.get_team_by_code("A"))
+    assert not a.clinched and a.magic == 20 - 18 + 1
+    assert e.can_meet(info.get_team_by_code("A"), info.get_team_by_code("C"))
+    assert not e.can_meet(info.get_team_by_code("A"), info.get_team_by_code("D"))
+
+
+def test_not_eliminated_when_enough_rivals_can_pass(monkeypatch):
+    # T reaches at most 4 points, seven teams are done with 4 points, eight teams with 3 points play 24 games among
+    # themselves: seven of them can finish ahead while the eighth loses out, T still finishes 8th
+    records = [("T", 82, 4)] + [("A" + str(i), 82, 4) for i in range(7)] + [("B" + str(i), 76, 3) for i in range(8)]
+    info = make_info(records)
+    games = [game(info, "B" + str(i), "B" + str((i + d) % 8)) for i in range(8) for d in (1, 2, 3)]
+    team = info.get_team_by_code("T")
+    assert not Elimination(info, games, division_spots=8, wildcard_spots=0).get(team).eliminated
+    # the same with a truncated search
+    monkeypatch.setattr(elimination, "MAX_COMBINATIONS", 0)
+    assert not Elimination(info, games, division_spots=8, wildcard_spots=0).get(team).eliminated
+
+
+def test_eliminated_after_full_search(monkeypatch):
+    # whichever of A, B and C finishes ahead, the two others play each other and one of them passes D
+    info = make_info([("A", 80, 14), ("B", 80, 14), ("C", 80, 14), ("D", 80, 10), ("E", 80, 0)])
+    games = [game(info, "A", "B"), game(info, "B", "C"), game(info, "C", "A")]
+    d = info.get_team_by_code("D")
+    assert Elimination(info, games, division_spots=2, wildcard_spots=0).get(d).eliminated
+    monkeypatch.setattr(elimination, "MAX_COMBINATIONS", 0)
+    assert not Elimination(info, games, division_spots=2, wildcard_spots=0).get(d).eliminated
@@ -0,0 +1,124 @@
+import os
+
+from tankbot import serde
+from tankbot.api import Result, _bag
+from tankbot.ledger import Ledger
+
+INFO2 = serde.loadf(os.path.join(os.path.dirname(__file__), "info2.json"))
+
+
+def entry(game, final):
+    e = {
+        "gameType": "R",
+        "gameDate": game.time.isoformat(),
+        "status": {"abstractGameState": "Final" if final else "Preview"},
+        "teams": {"home": {"team": {"id": game.home.id}}, "away": {"team": {"id": game.away.id}}},
+    }
+    if final:
+        e["teams"]["home"]["score"] = getattr(game, "home_score", 3)
+        e["teams"]["away"]["score"] = getattr(game, "away_score", 2)
+        overtime = getattr(game, "overtime", False)
+        e["linescore"] = {"periods": [1, 2, 3, 4] if overtime else [1, 2, 3], "hasShootout": False}
+    return e
+
+
+class FakeClient:
+    def __init__(self, final):
+        self.final = final
+        self.calls = []
+
+    def schedule(self, start_date, end_date, expand=None):
+        self.calls.append((start_date, end_date))
+        days = [
+            (INFO2.past_date.date().isoformat(), [entry(r, True) for r in INFO2.results]),
+            (INFO2.date.date().isoformat(), [entry(g, self.final) for g in INFO2.games]),
+        ]
+        return _bag({"dates": [{"date": d, "games": g} for d, g in days if start_date <= d <= end_date]})
+
+
+def test_sync_and_index(tmp_path):
+    ledger = Ledger(tmp_path / "ledger.jsonl")
+    client = FakeClient(final=False)
+    ledger.sync(client, INFO2, INFO2.date)
+
+    assert len(client.calls) == 1
+    assert ledger.synced == INFO2.past_date.date()
+    assert ledger.results_on(INFO2.past_date) == sorted(INFO2.results, key=lambda r: r.time)
+    assert len(ledger.games_on(INFO2.date)) == len(INFO2.games)
+    assert not any(isinstance(g, Result) for g in ledger.games_on(INFO2.date))
+
+    mtl = INFO2.get_team_by_code("mtl")
+    assert all(mtl in (g.home, g.away) for g in ledger.games_for(mtl))
+    assert len(ledger.games_between(INFO2.past_date, INFO2.date)) == len(INFO2.results) + len(INFO2.games)
+
+
+def test_incremental_sync_and_reload(tmp_path):
+    path = tmp_path / "ledger.jsonl"
+    ledger = Ledger(path)
+    ledger.sync(FakeClient(final=False), INFO2, INFO2.date)
+
+    # the next sync only asks for the days that were not final yet
+    client = FakeClient(final=True)
+    tomorrow = INFO2.date.shift(days=1)
+    ledger.sync(client, INFO2, tomorrow)
+    assert client.calls == [(INFO2.date.date().isoformat(), tomorrow.date().isoformat())]
+    assert ledger.synced == INFO2.date.date()
+    assert len(ledger.results_on(INFO2.date)) == len(INFO2.games)
+
+    reloaded = Ledger(path)
+    assert reloaded.synced == ledger.synced
+    assert reloaded.games() == ledger.games()
+
+
+class ScheduleClient:
+    # serves a fixed schedule of (date, entries) days
+    def __init__(self, days):
+        self.days = days
+        self.calls = []
+
+    def schedule(self, start_date, end_date, expand=None):
+        self.calls.append((start_date, end_date))
+        return _bag({"dates": [{"date": d, "games": g} for d, g in self.days if start_date <= d <= end_date]})
+
+
+def test_new_season(tmp_path):
+    ledger = Ledger(tmp_path / "ledger.jsonl")
+    ledger.sync(FakeClient(final=True), INFO2, INFO2.date.shift(days=1))
+    assert ledger.results_before(INFO2.date.shift(days=1))
+
+    # the first sync of the next season fetches all of it, last season's games are not part of it
+    game = INFO2.games[0]
+    october = INFO2.date.replace(month=10, day=4)
+    later = october.shift(days=30)
+    client = ScheduleClient(
+        [(october.date().isoformat(), [entry(game, True)]), (later.date().isoformat(), [entry(game, False)])]
+    )
+    ledger.sync(client, INFO2, october.shift(days=1))
+    assert client.calls == [("{}-10-01".format(october.year), "{}-06-30".format(october.year + 1))]
+    assert len(ledger.results_before(october.shift(days=1))) == 1
+    assert len(ledger.remaining(october.shift(days=1))) == 1
+    assert ledger.remaining(INFO2.date.shift(days=1)) == []
+
+
+def test_postponed_game(tmp_path):
+    path = tmp_path / "ledger.jsonl"
+    game, other = INFO2.games[0], INFO2.games[1]
+    day, later = INFO2.date.date().isoformat(), INFO2.date.shift(days=5).date().isoformat()
+    scheduled = dict(entry(game, False), gamePk=1)
+    ledger = Ledger(path)
+    ledger.sync(ScheduleClient([(day, [scheduled])]), INFO2, INFO2.date)
+    assert len(ledger.games_on(INFO2.date)) == 1
+
+    # the day is complete even though the game was postponed, it is played later under the same id
+    postponed = dict(scheduled, status={"abstractGameState": "Preview", "detailedState": "Postponed"})
+    played = dict(entry(other, True), gamePk=2)
+    tomorrow = INFO2.date.shift(days=1)
+    ledger.sync(ScheduleClient([(day, [postponed, played]), (later, [scheduled])]), INFO2, tomorrow)
+    assert ledger.synced == INFO2.date.date()
+    assert len(ledger.results_on(INFO2.date)) == 1
+    assert len(ledger.remaining(tomorrow)) == 1
+    assert len(ledger.games_on(INFO2.date.shift(days=5))) == 1
+
+    reloaded = Ledger(path)
+    assert reloaded.games() == ledger.games()
+    assert reloaded.synced == ledger.synced
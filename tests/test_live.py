@@ -0,0 +1,147 @@
+import os
+
+from tankbot import serde
+from tankbot.analysis.tank import Analysis
+from tankbot.api import assign_lottery_odds
+from tankbot.daemon import GIVE_UP_HOUR
+from tankbot.generate import tank
+from tankbot.live import CALLED_OFF, IDLE_INTERVAL, LIVE_INTERVAL, LiveThread, ScoreFeed, follow
+from tankbot.posts import TANK
+
+INFO2 = serde.loadf(os.path.join(os.path.dirname(__file__), "info2.json"))
+assign_lottery_odds(INFO2.standings)
+assign_lottery_odds(INFO2.past_standings)
+
+
+def entry(game, state, away=0, home=0, periods=3, remaining="12:34"):
+    return {
+        "gameDate": game.time.to("utc").isoformat(),
+        "status": {"abstractGameState": state},
+        "teams": {
+            "away": {"team": {"id": game.away.id}, "score": away},
+            "home": {"team": {"id": game.home.id}, "score": home},
+        },
+        "linescore": {
+            "periods": [{}] * periods,
+            "currentPeriodOrdinal": "2nd",
+            "currentPeriodTimeRemaining": remaining,
+        },
+    }
+
+
+class Response:
+    def __init__(self, status_code, data=None, etag=None):
+        self.status_code = status_code
+        self.data = data
+        self.headers = {"ETag": etag} if etag else {}
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.data
+
+
+class FakeSession:
+    def __init__(self, pages):
+        self.pages = list(pages)
+        self.sent = []
+
+    def get(self, url, params=None, headers=None, timeout=None):
+        self.sent.append(dict(headers))
+        page = self.pages.pop(0)
+        if page is None:
+            return Response(304)
+        return Response(200, {"dates": [{"games": page}]}, etag='"{}"'.format(len(self.sent)))
+
+
+def test_conditional_polling():
+    game = INFO2.games[0]
+    session = FakeSession([[entry(game, "Preview")], None])
+    feed = ScoreFeed(session)
+    assert len(feed.poll(INFO2.date)) == 1
+    assert feed.poll(INFO2.date) is None
+    assert session.sent == [{}, {"If-None-Match": '"1"'}]
+    assert feed.not_modified == 1
+
+
+def make_thread():
+    a = Analysis(INFO2, INFO2.get_team_by_code("mtl"))
+    return LiveThread(TANK, a, tank.generate(a), "t3_1")
+
+
+def test_follow():
+    thread = make_thread()
+    games = [m.game for m in thread.matchups]
+    assert games
+
+    first = games[0]
+    others = [entry(g, "Preview") for g in INFO2.games if g is not first]
+    pages = [
+        [entry(g, "Preview") for g in INFO2.games],
+        [entry(first, "Live", 1, 0)] + others,
+        None,
+        # only the clock moved
+        [entry(first, "Live", 1, 0, remaining="11:02")] + others,
+        [entry(first, "Live", 1, 0, remaining="04:51")] + others,
+        [entry(g, "Final", 1, 2 if g is first else 0, periods=4) for g in INFO2.games],
+    ]
+    published = []
+    sleeps = []
+    clock = [min(g.time for g in INFO2.games).shift(minutes=-20)]
+
+    def sleep(seconds):
+        sleeps.append(seconds)
+        clock[0] = clock[0].shift(seconds=seconds)
+
+    follow(
+        INFO2,
+        [thread],
+        lambda t, text: published.append(text),
+        feed=ScoreFeed(FakeSession(pages)),
+        sleep=sleep,
+        now=lambda: clock[0],
+    )
+
+    # nothing shown changed before puck drop, on the unchanged poll and while only the clock ran
+    assert len(published) == 2
+    assert "|1-0 2nd|" in published[0] and "12:34" not in published[0]
+    assert "1-2 Final (OT)" in published[1]
+
+    # the live scores sit between the standings and tonight's games, the rest of the post is untouched
+    before, after = thread.markdown.split("## Tonight's tank", 1)
+    head, section = published[1].split("## Live scores", 1)
+    assert head == before and "## Standings" in head
+    assert section.endswith("***\n## Tonight's tank" + after)
+    assert all(str(mood) in ("Worst", "Bad", "Good", "Great") for mood in thread.moods.values())
+    assert len(thread.moods) == len(games)
+    assert sleeps == [IDLE_INTERVAL] + [LIVE_INTERVAL] * 4
+
+
+def test_follow_gives_up():
+    # a postponed game is over as far as following goes, a game that never starts is given up on the next day
+    thread = make_thread()
+    first = thread.matchups[0].game
+    stuck = next(g for g in INFO2.games if g is not first)
+    postponed = entry(first, "Preview")
+    postponed["status"]["detailedState"] = "Postponed"
+    others = [entry(g, "Final", periods=3) for g in INFO2.games if g is not first and g is not stuck]
+    page = [postponed, entry(stuck, "Preview")] + others
+    clock = [max(g.time for g in INFO2.games).shift(hours=1)]
+
+    def sleep(seconds):
+        clock[0] = clock[0].shift(seconds=seconds)
+
+    published = []
+    live = follow(
+        INFO2,
+        [thread],
+        lambda t, text: published.append(text),
+        feed=ScoreFeed(FakeSession([page] + [None] * 10000)),
+        sleep=sleep,
+        now=lambda: clock[0],
+    )
+    assert live[(first.home.id, first.away.id)].state == CALLED_OFF
+    assert live[(stuck.home.id, stuck.away.id)].state == "Preview"
+    assert clock[0] >= INFO2.date.shift(days=1).floor("day").replace(hour=GIVE_UP_HOUR)
+    assert "Postponed" in published[0]
@@ -0,0 +1,82 @@
+import os
+
+import pytest
+from tankbot import serde
+from tankbot.lottery import RULES, LotteryRules, pick_odds, slot_odds
+
+INFO2 = serde.loadf(os.path.join(os.path.dirname(__file__), "info2.json"))
+
+
+def brute_force(rules):
+    # enumerate every sequence of draws
+    n = len(rules.odds)
+    probs = [[0.0] * n for _ in range(n)]
+
+    def walk(drawn, p):
+        if len(drawn) == rules.draws:
+            order = drawn + [r for r in range(n) if r not in drawn]
+            for pick, r in enumerate(order):
+                probs[r][pick] += p
+            return
+        left = [r for r in range(n) if r not in drawn]
+        total = sum(rules.odds[r] for r in left)
+        for r in left:
+            walk(drawn + [r], p * rules.odds[r] / total)
+
+    walk([], 1.0)
+    return probs
+
+
+def test_matches_brute_force():
+    rules = RULES[2017]
+    for dp_row, bf_row in zip(slot_odds(rules), brute_force(rules)):
+        assert dp_row == pytest.approx(bf_row)
+
+
+def test_distribution():
+    for rules in RULES.values():
+        probs = slot_odds(rules)
+        for row in probs:
+            assert sum(row) == pytest.approx(1)
+        for pick in range(len(probs)):
+            assert sum(row[pick] for row in probs) == pytest.approx(1)
+
+
+def test_first_overall_matches_table():
+    rules = RULES[2017]
+    assert [row[0] * 100 for row in slot_odds(rules)] == pytest.approx(list(rules.odds))
+
+
+def test_worst_team_falls_at_most_draws_spots():
+    rules = RULES[2019]
+    worst = slot_odds(rules)[0]
+    assert all(p == 0 for p in worst[4:])
+
+
+def test_max_jump():
+    rules = LotteryRules([25, 25, 25, 25], draws=2, max_jump=1)
+    probs = slot_odds(rules)
+    # the third worst team can at best move up to the second pick
+    assert probs[2][0] == 0
+    assert probs[3][0] == 0 and probs[3][1] == 0
+
+
+def test_pick_odds():
+    odds = pick_odds(INFO2.standings, RULES[2019])
+    worst = max(INFO2.standings, key=lambda s: s.place).team
+    assert odds[worst].slots[0] == pytest.approx(0.185)
+    assert 1 < odds[worst].expected <= 4
+    assert len(odds) == 15
+    assert pick_odds(INFO2.standings, RULES[2019]) is odds
+
+
+def test_2022_published_odds():
+    # the odds published by the NHL for the 2022 and 2023 drafts: a team outside the bottom 11 that wins a draw moves up
+    # 10 spots and the drawn pick goes to the worst team
+    probs = slot_odds(RULES[2022])
+    first = [25.5, 13.5, 11.5, 9.5, 8.5, 7.5, 6.5, 6.0, 5.0, 3.5, 3.0, 0, 0, 0, 0, 0]
+    assert [row[0] * 100 for row in probs] == pytest.approx(first)
+    assert [p * 100 for p in probs[0][:3]] == pytest.approx([25.5, 18.8, 55.7], abs=0.05)
+    # the best team of the lottery can only move up to the 6th pick
+    assert probs[15][5] * 100 == pytest.approx(1.0, abs=0.05)
+    assert all(p == 0 for p in probs[15][:5])
@@ -0,0 +1,72 @@
+import json
+import os
+
+from tankbot import serde
+from tankbot.api import MeteredNHLAPI, assign_lottery_odds
+from tankbot.metrics import Metrics
+from tankbot.posts import PLAYOFFS, TANK, render_posts
+
+INFO2 = serde.loadf(os.path.join(os.path.dirname(__file__), "info2.json"))
+assign_lottery_odds(INFO2.standings)
+assign_lottery_odds(INFO2.past_standings)
+
+
+def test_report_and_textfile(tmp_path):
+    metrics = Metrics()
+    with metrics.span("analysis", kind="tank"):
+        pass
+    metrics.observe("analysis", 0.5, kind="tank")
+    metrics.count("api_bytes", 100, endpoint="teams")
+    metrics.count("api_bytes", 20, endpoint="teams")
+    metrics.count("posts_rendered", 2)
+
+    report, textfile = tmp_path / "run.json", tmp_path / "tankbot.prom"
+    metrics.write(str(report), str(textfile))
+    data = json.loads(report.read_text())
+    assert len(data["spans"]) == 2 and data["spans"][1]["start_ms"] is None
+    (total,) = data["totals"]
+    assert total["count"] == 2 and total["seconds"] >= 0.5
+    assert {"name": "api_bytes", "labels": {"endpoint": "teams"}, "value": 120} in data["counters"]
+
+    lines = textfile.read_text().splitlines()
+    assert "# TYPE tankbot_analysis_seconds summary" in lines
+    assert 'tankbot_analysis_seconds_count{kind="tank"} 2' in lines
+    assert 'tankbot_api_bytes_total{endpoint="teams"} 120' in lines
+    assert "tankbot_posts_rendered_total 2" in lines
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_merge_and_reset():
+    a, b = Metrics(), Metrics()
+    b.observe("generate", 1.0, kind="tank")
+    b.count("posts_rendered")
+    a.merge(b.samples())
+    a.merge(b.samples())
+    assert a.totals() == {("generate", (("kind", "tank"),)): [2, 2.0]}
+    a.reset()
+    assert a.samples() == ([], {})
+
+
+def test_render_posts_spans():
+    jobs = [(PLAYOFFS, "MTL"), (TANK, "MTL"), (TANK, "BOS")]
+    for processes in (1, 2):
+        metrics = Metrics()
+        posts = list(render_posts(INFO2, jobs, processes=processes, metrics=metrics))
+        assert len(posts) == 3
+        totals = metrics.totals()
+        assert totals[("analysis", (("kind", TANK),))][0] == 2
+        assert totals[("generate", (("kind", PLAYOFFS),))][0] == 1
+
+
+def test_metered_api():
+    class API:
+        def teams(self, **params):
+            return {"teams": [{"id": 1}]}
+
+    metrics = Metrics()
+    api = MeteredNHLAPI(API(), metrics)
+    api.teams()
+    api.teams()
+    _, counters = metrics.samples()
+    assert counters[("api_calls", (("endpoint", "teams"),))] == 2
+    assert counters[("api_bytes", (("endpoint", "teams"),))] == 2 * len('{"teams":[{"id":1}]}')
@@ -3,7 +3,7 @@ import os
 import arrow
 from tankbot import serde
 from tankbot.analysis import Mood
-from tankbot.analysis.playoffs import Analysis, Matchup
+from tankbot.analysis.playoffs import Analysis, Matchup, analyze_all
 from tankbot.api import Result
 
 INFO0 = serde.loadf(os.path.join(os.path.dirname(__file__), "info0.json"))
@@ -172,3 +172,28 @@ def test_mood_ideal_team_ot_loss():
     m = Matchup(game, my_team_involved=False)
     m.ideal_winner = "tor"
     assert m.get_mood() == Mood.WORST
+
+
+def seeds(standings):
+    return [(s.team, s.place, s.seed) for s in standings]
+
+
+def test_analyze_all_matches_single_analysis():
+    for info in (INFO0, INFO1, INFO2):
+        for a in analyze_all(info, info.teams):
+            single = Analysis(info, a.my_team)
+            assert a.my_outlook == single.my_outlook
+            assert seeds(a.own_division) == seeds(single.own_division)
+            assert seeds(a.other_division) == seeds(single.other_division)
+            assert seeds(a.wildcard) == seeds(single.wildcard)
+            for m, single_m in zip(a.playoffs_matchups, single.playoffs_matchups):
+                assert seeds([m.high_team, m.low_team]) == seeds([single_m.high_team, single_m.low_team])
+            assert [m.ideal_winner for m in a.games] == [m.ideal_winner for m in single.games]
+            assert [m.ideal_winner for m in a.results] == [m.ideal_winner for m in single.results]
+
+
+def test_analyze_all_shares_conference_views():
+    mtl, tor, van = (INFO0.get_team_by_code(code) for code in ("mtl", "tor", "van"))
+    a_mtl, a_tor, a_van = analyze_all(INFO0, [mtl, tor, van])
+    assert a_mtl.view is a_tor.view
+    assert a_mtl.view is not a_van.view
@@ -0,0 +1,36 @@
+import os
+
+from tankbot import serde
+from tankbot.analysis.playoffs import Analysis, analyze_all
+from tankbot.generate import playoffs
+
+INFOS = [serde.loadf(os.path.join(os.path.dirname(__file__), "info{}.json".format(n))) for n in range(3)]
+
+
+def _uncached(info, team):
+    # an analysis with a view of its own renders every section itself
+    return playoffs.generate(Analysis(info, team))
+
+
+def test_shared_sections_match_uncached():
+    for info in INFOS:
+        for a in analyze_all(info, info.teams):
+            assert playoffs.generate(a) == _uncached(info, a.my_team)
+
+
+def test_shared_sections_rendered_once_per_division():
+    info = INFOS[0]
+    analyses = analyze_all(info, info.teams)
+    for a in analyses:
+        playoffs.generate(a)
+    views = {id(a.view): a.view for a in analyses}.values()
+    assert sum(len(view.fragments) for view in views) == len({(t.conference, t.division) for t in info.teams})
+
+
+def test_shared_sections_follow_the_standings():
+    info = INFOS[1]
+    a = analyze_all(info, [info.get_team_by_code("mtl")])[0]
+    first = playoffs.generate(a)
+    info._rebuild_cache()
+    assert playoffs.generate(a) == first
+    assert len(a.view.fragments) == 2
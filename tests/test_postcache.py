@@ -0,0 +1,31 @@
+import os
+
+from attr import evolve
+from tankbot import serde
+from tankbot.postcache import CachedPost, PostCache, input_hash
+
+INFO2 = serde.loadf(os.path.join(os.path.dirname(__file__), "info2.json"))
+
+
+def test_input_hash():
+    digest = input_hash(INFO2, False)
+    assert input_hash(evolve(INFO2, date=INFO2.date.shift(hours=-1)), False) == digest
+    assert input_hash(INFO2, True) != digest
+    assert input_hash(evolve(INFO2, results=INFO2.results[1:]), False) != digest
+
+
+def test_is_current(tmp_path):
+    cache = PostCache(tmp_path)
+    date = INFO2.date
+    assert not cache.is_current("playoffs", "MTL", date, "abc")
+
+    cache.put("playoffs", "MTL", date, CachedPost("abc", "text"))
+    assert not cache.is_current("playoffs", "mtl", date, "abc")
+    assert cache.is_current("playoffs", "mtl", date, "abc", submitted=False)
+
+    cache.set_submission("playoffs", "MTL", date, "t3_1")
+    assert PostCache(tmp_path).get("playoffs", "MTL", date) == CachedPost("abc", "text", "t3_1")
+    assert cache.is_current("playoffs", "MTL", date, "abc")
+    assert not cache.is_current("playoffs", "MTL", date, "def")
+    assert not cache.is_current("tank", "MTL", date, "abc")
+    assert not cache.is_current("playoffs", "MTL", date.shift(days=1), "abc")
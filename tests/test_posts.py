@@ -0,0 +1,19 @@
+import os
+
+from tankbot import serde
+from tankbot.api import assign_lottery_odds
+from tankbot.posts import PLAYOFFS, TANK, render_posts
+
+INFO2 = serde.loadf(os.path.join(os.path.dirname(__file__), "info2.json"))
+assign_lottery_odds(INFO2.standings)
+assign_lottery_odds(INFO2.past_standings)
+
+
+def test_processes_keep_order_and_output():
+    jobs = [(kind, team.code) for team in INFO2.teams[:6] for kind in (PLAYOFFS, TANK)]
+    serial = list(render_posts(INFO2, jobs))
+    parallel = list(render_posts(INFO2, jobs, processes=3))
+    assert [(p.kind, p.team.code) for p in parallel] == jobs
+    assert [(p.kind, p.team.code, p.title, p.text) for p in parallel] == [
+        (p.kind, p.team.code, p.title, p.text) for p in serial
+    ]
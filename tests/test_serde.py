@@ -0,0 +1,58 @@
+import os
+
+import pytest
+from tankbot import serde
+from tankbot.api import assign_lottery_odds
+
+FIXTURES = [os.path.join(os.path.dirname(__file__), "info{}.json".format(n)) for n in range(3)]
+
+
+def _dumps(info):
+    # odds are not part of the snapshot, they are assigned after loading
+    assign_lottery_odds(info.standings)
+    assign_lottery_odds(info.past_standings)
+    return serde.dumps(info)
+
+
+@pytest.mark.parametrize("path", FIXTURES)
+def test_binary_round_trip(path):
+    info = serde.loadf(path)
+    data = serde.dumpb(info)
+    assert _dumps(serde.loadb(data)) == _dumps(info)
+    assert len(data) < len(serde.dumps(info)) / 4
+
+
+def test_binary_shares_teams():
+    info = serde.loadb(serde.dumpb(serde.loadf(FIXTURES[0])))
+    teams = {id(team) for team in info.teams}
+    assert all(id(s.team) in teams for s in info.standings)
+    assert all(id(g.home) in teams and id(g.away) in teams for g in info.games)
+
+
+def test_binary_values():
+    value = {"a": [1, -300, 2**40, 1.5, None, True, False, "été"], 7: "a"}
+    assert serde.loadb(serde.dumpb(value)) == value
+
+
+def test_binary_rejects_garbage():
+    with pytest.raises(ValueError):
+        serde.loadb(b"nope")
+
+
+def test_loads_fills_missing_defaults():
+    text = serde.dumps(serde.loadf(FIXTURES[0]).results[0])
+    result = serde.loads(text.replace('"shootout": false, ', ""))
+    assert result.shootout is False
+    assert serde.dumps(result) == text
+
+
+@pytest.mark.parametrize("indent", [None, 4])
+def test_json_shares_teams(indent):
+    info = serde.loadf(FIXTURES[1])
+    _dumps(info)
+    text = serde.dumps(info, indent=indent)
+    assert text.count('"fullname"') == len(info.teams)
+    for loaded in (info, serde.loads(text)):
+        teams = {id(team) for team in loaded.teams}
+        assert all(id(s.team) in teams for s in loaded.standings + loaded.past_standings)
+        assert all(id(g.home) in teams and id(g.away) in teams for g in loaded.games + loaded.results)
@@ -0,0 +1,43 @@
+import os
+
+import pytest
+from tankbot import serde
+from tankbot.api import Game
+
+np = pytest.importorskip("numpy")
+
+from tankbot.analysis.simulation import playoff_odds  # noqa: E402
+
+INFO2 = serde.loadf(os.path.join(os.path.dirname(__file__), "info2.json"))
+
+
+def remaining_games(days=20):
+    # every team plays its neighbour in the standings, rotating every day
+    games = []
+    teams = list(INFO2.teams)
+    for day in range(days):
+        teams = teams[1:] + teams[:1]
+        for i in range(0, len(teams) - 1, 2):
+            games.append(Game(time=INFO2.date.shift(days=day), home=teams[i], away=teams[i + 1]))
+    return games
+
+
+def test_probabilities():
+    odds = playoff_odds(INFO2, remaining_games(), simulations=20000, seed=1)
+    # exactly 8 teams make it in each conference in every simulation
+    for conference in ("Eastern", "Western"):
+        assert sum(p for t, p in odds.items() if t.conference == conference) == pytest.approx(8)
+    assert all(0 <= p <= 1 for p in odds.values())
+
+
+def test_no_games_left():
+    odds = playoff_odds(INFO2, [], simulations=1000, seed=1)
+    assert odds[INFO2.get_team_by_code("tbl")] == 1
+    assert odds[INFO2.get_team_by_code("ott")] == 0
+
+
+def test_reproducible():
+    games = remaining_games()
+    first = playoff_odds(INFO2, games, simulations=25000, seed=42)
+    assert playoff_odds(INFO2, games, simulations=25000, seed=42) == first
+    assert playoff_odds(INFO2, games, simulations=25000, seed=42, processes=2) == first
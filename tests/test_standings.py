@@ -0,0 +1,72 @@
+import os
+
+import arrow
+from tankbot import serde
+from tankbot.api import Result, assign_lottery_odds
+from tankbot.lottery import rules_for
+from tankbot.standings import compute_standings, daily_standings
+
+INFO0 = serde.loadf(os.path.join(os.path.dirname(__file__), "info0.json"))
+
+
+def team(code):
+    return INFO0.get_team_by_code(code)
+
+
+def result(day, home, away, home_score, away_score, overtime=False, shootout=False):
+    return Result(
+        time=arrow.get(day).replace(hour=19),
+        home=team(home),
+        away=team(away),
+        home_score=home_score,
+        away_score=away_score,
+        overtime=overtime,
+        shootout=shootout,
+    )
+
+
+RESULTS = [
+    result("2019-01-01", "mtl", "tor", 3, 2),
+    result("2019-01-01", "bos", "buf", 2, 3, overtime=True),
+    result("2019-01-02", "tor", "mtl", 4, 3, overtime=True, shootout=True),
+    result("2019-01-03", "mtl", "bos", 1, 5),
+]
+
+
+def by_code(standings):
+    return {s.team.code.lower(): s for s in standings}
+
+
+def test_records():
+    standings = by_code(compute_standings(INFO0.teams, RESULTS, arrow.get("2019-01-04")))
+    mtl = standings["mtl"]
+    assert (mtl.gamesPlayed, mtl.wins, mtl.losses, mtl.ot, mtl.points, mtl.row) == (3, 1, 1, 1, 3, 1)
+    assert mtl.last10 == "1-1-1"
+    tor = standings["tor"]
+    assert (tor.wins, tor.losses, tor.ot, tor.points, tor.row) == (1, 1, 0, 2, 0)
+    assert standings["bos"].points == 3
+    assert standings["ana"].gamesPlayed == 0
+
+
+def test_date_excludes_same_day_games():
+    standings = by_code(compute_standings(INFO0.teams, RESULTS, arrow.get("2019-01-02")))
+    assert standings["mtl"].points == 2
+    assert standings["tor"].gamesPlayed == 1
+
+
+def test_order():
+    standings = compute_standings(INFO0.teams, RESULTS, arrow.get("2019-01-04"))
+    assign_lottery_odds(standings, rules_for(arrow.get("2019-01-04")))
+    assert [s.place for s in standings] == list(range(1, len(INFO0.teams) + 1))
+    # bos and mtl both have 3 points in 3 games, bos has more ROW
+    assert [s.team.code.lower() for s in standings[:2]] == ["bos", "mtl"]
+    # the 2018-19 lottery, not the default rules
+    assert standings[-1].odds == 18.5
+
+
+def test_daily_standings():
+    days = list(daily_standings(INFO0.teams, RESULTS))
+    assert [d.isoformat() for d, _ in days] == ["2019-01-01", "2019-01-02", "2019-01-03"]
+    for day, standings in days:
+        expected = compute_standings(INFO0.teams, RESULTS, arrow.get(day).shift(days=1))
+        assert [(s.team, s.points) for s in standings] == [(s.team, s.points) for s in expected]
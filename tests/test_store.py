@@ -0,0 +1,55 @@
+import os
+
+from attr import evolve
+from tankbot import serde
+from tankbot.store import Store
+
+INFO2 = serde.loadf(os.path.join(os.path.dirname(__file__), "info2.json"))
+
+
+def _standings(standings):
+    return [(s.team.id, s.place, s.gamesPlayed, s.points, s.row, s.last10) for s in standings]
+
+
+def test_info_round_trip():
+    store = Store()
+    store.save(INFO2)
+    info = store.info(INFO2.date)
+    assert _standings(info.standings) == _standings(INFO2.standings)
+    assert _standings(info.past_standings) == _standings(INFO2.past_standings)
+    assert sorted((g.home.id, g.away.id) for g in info.games) == sorted((g.home.id, g.away.id) for g in INFO2.games)
+    assert sorted((r.home.id, r.home_score, r.away_score, r.overtime) for r in info.results) == sorted(
+        (r.home.id, r.home_score, r.away_score, r.overtime) for r in INFO2.results
+    )
+    assert info.get_standing(info.teams[0]).team is info.teams[0]
+    assert store.info(INFO2.date.shift(days=10)) is None
+
+
+def test_queries(tmp_path):
+    path = tmp_path / "tankbot.db"
+    with Store(path) as store:
+        store.save(INFO2)
+
+    with Store(path) as store:
+        team = INFO2.standings[0].team
+        assert store.points_trajectory(team) == [
+            (INFO2.past_date.date(), INFO2.get_standing(team, True).gamesPlayed, INFO2.get_standing(team, True).points),
+            (INFO2.date.date(), INFO2.get_standing(team).gamesPlayed, INFO2.get_standing(team).points),
+        ]
+        assert store.points_trajectory(team, start=INFO2.date) == store.points_trajectory(team)[1:]
+
+        result = INFO2.results[0]
+        between = store.results_between(result.away, result.home)
+        assert [(r.home.id, r.away.id, r.home_score) for r in between] == [
+            (result.home.id, result.away.id, result.home_score)
+        ]
+        assert store.results_between(result.home, result.away, end=INFO2.date.shift(days=-2)) == []
+
+
+def test_past_standings_do_not_replace_a_saved_day():
+    store = Store()
+    yesterday = evolve(INFO2, date=INFO2.past_date, standings=INFO2.past_standings, past_standings=[])
+    store.save(yesterday)
+    # the next day's past standings are a different table, the one saved yesterday is kept
+    store.save(evolve(INFO2, past_standings=INFO2.standings))
+    assert _standings(store.info(INFO2.date).past_standings) == _standings(INFO2.past_standings)
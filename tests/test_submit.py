@@ -0,0 +1,146 @@
+import arrow
+
+from tankbot.api import Team
+from tankbot.posts import TANK, Post
+from tankbot.submit import SubmissionQueue
+
+MTL = Team(
+    id=8,
+    code="MTL",
+    fullname="Montréal Canadiens",
+    name="Canadiens",
+    location="Montréal",
+    division="Atlantic",
+    conference="Eastern",
+    subreddit="habs",
+)
+
+
+class FakeSubmission:
+    def __init__(self, id, reddit=None):
+        self.id = id
+        self.reddit = reddit
+
+    def edit(self, body):
+        self.reddit.edits.append((self.id, body))
+
+
+class FakeSubreddit:
+    def __init__(self, reddit, name):
+        self.reddit = reddit
+        self.name = name
+
+    def submit(self, title, selftext, send_replies=True):
+        if self.reddit.failures:
+            self.reddit.failures -= 1
+            raise Exception(self.reddit.error)
+        self.reddit.posts.append((self.name, title, selftext))
+        return FakeSubmission("t3_{}".format(len(self.reddit.posts)))
+
+
+class FakeAuth:
+    limits = {"remaining": 100, "reset_timestamp": None, "used": 0}
+
+
+class FakeReddit:
+    def __init__(self, failures=0, error="server error"):
+        self.failures = failures
+        self.error = error
+        self.posts = []
+        self.edits = []
+        self.auth = FakeAuth()
+
+    def subreddit(self, name):
+        return FakeSubreddit(self, name)
+
+    def submission(self, id):
+        return FakeSubmission(id, self)
+
+
+def post(title="Scouting the Tank"):
+    return Post(TANK, MTL, title, "text")
+
+
+def test_submit(tmp_path):
+    reddit = FakeReddit()
+    q = SubmissionQueue(reddit, tmp_path, sleep=lambda s: None).start()
+    q.put(post("a"))
+    q.put(post("b"))
+    submitted = q.close()
+    assert [p[1] for p in reddit.posts] == ["a", "b"]
+    assert [s.submission_id for s in submitted] == ["t3_1", "t3_2"]
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_retry_with_backoff(tmp_path):
+    reddit = FakeReddit(failures=2)
+    sleeps = []
+    q = SubmissionQueue(reddit, tmp_path, backoff=1, sleep=sleeps.append).start()
+    q.put(post())
+    (s,) = q.close()
+    assert s.attempts == 3 and s.error is None
+    assert sleeps == [1, 2]
+
+
+def test_ratelimit_delay(tmp_path):
+    reddit = FakeReddit(failures=1, error="RATELIMIT: 'you are doing that too much. try again in 9 minutes.'")
+    sleeps = []
+    q = SubmissionQueue(reddit, tmp_path, sleep=sleeps.append).start()
+    q.put(post())
+    q.close()
+    assert sleeps == [9 * 60]
+
+
+def test_failed_posts_are_kept_and_resent(tmp_path):
+    reddit = FakeReddit(failures=10)
+    q = SubmissionQueue(reddit, tmp_path, retries=1, sleep=lambda s: None).start()
+    q.put(post())
+    (s,) = q.close()
+    assert s.error is not None
+    assert len(list(tmp_path.glob("*.json"))) == 1
+
+    reddit.failures = 0
+    q = SubmissionQueue(reddit, tmp_path, sleep=lambda s: None)
+    assert q.resend() == 1
+    q.start()
+    (s,) = q.close()
+    assert s.submission_id == "t3_1"
+    assert reddit.posts == [("habs", "Scouting the Tank", "text")]
+    assert list(tmp_path.glob("*.json")) == []
+
+
+def test_edit(tmp_path):
+    reddit = FakeReddit()
+    q = SubmissionQueue(reddit, tmp_path, sleep=lambda s: None).start()
+    q.put(post("a"), submission_id="t3_9")
+    (s,) = q.close()
+    assert reddit.posts == []
+    assert reddit.edits == [("t3_9", "text")]
+    assert s.edited and s.submission_id == "t3_9"
+
+
+def test_stale_posts_are_dropped(tmp_path):
+    # a post that failed on the 17th must not go up as a new thread on the 18th
+    reddit = FakeReddit(failures=10)
+    q = SubmissionQueue(reddit, tmp_path, arrow.get("2019-10-17"), retries=0, sleep=lambda s: None).start()
+    q.put(post("Playoffs Race: October 17th, 2019"))
+    q.close()
+    q = SubmissionQueue(reddit, tmp_path, arrow.get("2019-10-19"), retries=0, sleep=lambda s: None).start()
+    q.put(post("Playoffs Race: October 19th, 2019"))
+    q.close()
+    assert len(list(tmp_path.glob("*.json"))) == 2
+
+    reddit.failures = 0
+    q = SubmissionQueue(reddit, tmp_path, arrow.get("2019-10-18"), sleep=lambda s: None)
+    assert q.resend() == 0
+    assert [e["title"] for e in q.dropped] == ["Playoffs Race: October 17th, 2019"]
+    q.start()
+    assert q.close() == []
+    # the later day's post is left for its own run
+    assert len(list(tmp_path.glob("*.json"))) == 1
+
+    q = SubmissionQueue(reddit, tmp_path, arrow.get("2019-10-19"), sleep=lambda s: None)
+    assert q.resend() == 1
+    q.start()
+    (s,) = q.close()
+    assert reddit.posts == [("habs", "Playoffs Race: October 19th, 2019", "text")]
@@ -0,0 +1,46 @@
+from collections import Counter
+
+import pytest
+from tankbot import serde, synthetic
+from tankbot.analysis import playoffs, tank
+
+
+def test_deterministic():
+    a = synthetic.make_info(40, games_per_team=20, seed=3)
+    b = synthetic.make_info(40, games_per_team=20, seed=3)
+    c = synthetic.make_info(40, games_per_team=20, seed=4)
+    assert serde.dumpb(a) == serde.dumpb(b)
+    assert serde.dumpb(a) != serde.dumpb(c)
+
+
+def test_teams():
+    teams = synthetic.make_teams(702, conferences=2, divisions=3)
+    assert len({t.code for t in teams}) == 702
+    assert teams[0].code == "AAA"
+    assert Counter(t.conference for t in teams) == {"Conference 1": 351, "Conference 2": 351}
+    assert len({t.division for t in teams}) == 6
+    with pytest.raises(ValueError):
+        synthetic.make_teams(10)
+
+
+def test_season():
+    league = synthetic.make_league(32, games_per_team=20, progress=1.0)
+    played = Counter()
+    for g in league.schedule:
+        played[g.home] += 1
+        played[g.away] += 1
+    assert set(played.values()) == {20}
+
+    # the results of the last day are not in yet
+    info = league.info()
+    assert all(s.gamesPlayed <= 20 for s in info.standings)
+    assert sum(s.gamesPlayed for s in info.standings) == 2 * len(league.results)
+    assert info.games and all(g.time.date() == info.date.date() for g in info.games)
+
+
+def test_feeds_analysis_and_serde():
+    info = synthetic.make_info(124, games_per_team=40, seed=1)
+    assert serde.loadb(serde.dumpb(info)).teams == info.teams
+    for team in info.teams[::31]:
+        tank.Analysis(info, team)
+        playoffs.Analysis(info, team)
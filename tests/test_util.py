@@ -0,0 +1,29 @@
+import datetime
+
+import arrow
+from tankbot.util import as_date, f, template
+
+
+def render(points, games):
+    # the names are only referenced by the template, as in the generators
+    return f("{points / (games * 2):0.3f} {games!r:>4}")
+
+
+def test_f_uses_caller_namespace():
+    assert render(57, 50) == "0.570   50"
+    assert render(41, 41) == "0.500   41"
+    assert f("{}-{}", 1, 2) == "1-2"
+
+
+def test_template():
+    fmt = template("{a.upper()} ({b})", "a", "b")
+    assert fmt("mtl", 3) == "MTL (3)"
+    assert template("{a.upper()} ({b})", "a", "b")("tor", 1) == "TOR (1)"
+
+
+def test_as_date():
+    day = datetime.date(2019, 1, 12)
+    assert as_date(arrow.get("2019-01-12T19:00:00-05:00")) == day
+    assert as_date(datetime.datetime(2019, 1, 12, 19)) == day
+    assert as_date(day) == day
+    assert as_date(None) is None